@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+"""Compare building and holding a parameter hierarchy as SSMPath models vs a CompactTree.
+
+Both are built offline from the same listing pages that ``get_parameters_by_path`` returns, the
+SSMPath tree the way ``SSMPath._load_tree`` builds it. Memory is what tracemalloc sees allocated
+and still alive after the build, divided by the number of parameters.
+
+Run with ``python benchmarks/bench_compact_tree.py``.
+"""
+from __future__ import annotations
+
+import gc
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+from ssm_parameter_config.compact import CompactTree
+from ssm_parameter_config.ssm_parameter import SSMPath, _record
+
+SIZES = (1000, 10000, 50000)
+NOW = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def make_listing(n: int) -> list[dict]:
+    # /bench/app_<i % 50>/env_<i % 7>/param_<i>, roughly how service configs fan out
+    return [
+        {
+            "Name": f"/bench/app_{i % 50}/env_{i % 7}/param_{i}",
+            "Type": "String",
+            "Value": f"value number {i}",
+            "Version": 1,
+            "LastModifiedDate": NOW,
+            "DataType": "text",
+        }
+        for i in range(n)
+    ]
+
+
+def build_models(listing: list[dict]) -> SSMPath:
+    root = SSMPath(name="/bench")
+    root._insert_parameters(  # pylint:disable=protected-access
+        root._parse_listed(p, got_metadata=False) for p in listing  # pylint:disable=protected-access
+    )
+    return root
+
+
+def build_compact(listing: list[dict]) -> CompactTree:
+    tree = CompactTree("/bench")
+    tree.extend(map(_record, listing))
+    return tree
+
+
+def measure(build, listing) -> tuple[float, float]:
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    tree = build(listing)
+    elapsed = time.perf_counter() - start
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del tree
+    return elapsed, size / len(listing)
+
+
+def main():
+    print(f"{'params':>7} {'models s':>9} {'compact s':>10} {'models B/p':>11} {'compact B/p':>12} {'mem':>6}")
+    for n in SIZES:
+        listing = make_listing(n)
+        models_time, models_mem = measure(build_models, listing)
+        compact_time, compact_mem = measure(build_compact, listing)
+        print(
+            f"{n:>7} {models_time:>9.3f} {compact_time:>10.3f} {models_mem:>11.0f} {compact_mem:>12.0f}"
+            f" {models_mem / compact_mem:>5.1f}x",
+        )
+
+
+if __name__ == "__main__":
+    main()
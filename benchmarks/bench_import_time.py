@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""Import time of the package and its entry points, measured with ``python -X importtime``.
+
+Each statement runs in a fresh interpreter several times; the median cumulative time of the
+imports it triggers is reported, along with any of the heavy optional imports it pulled in.
+Pass ``--max-ms N`` to exit non-zero when the bare package import gets slower than that, for
+use as a regression check in CI.
+
+Run with ``python benchmarks/bench_import_time.py``.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import subprocess  # nosec B404
+import sys
+
+STATEMENTS = (
+    "import ssm_parameter_config",
+    "from ssm_parameter_config import SSMConfig",
+    "from ssm_parameter_config import SSMParameter",
+    "import boto3",
+    "import pydantic",
+)
+HEAVY = ("boto3", "botocore", "ruamel.yaml", "dotenv", "signed_pickle", "asyncio")
+RUNS = 7
+
+
+def measure(statement: str) -> tuple[float, list[str]]:
+    """Cumulative import time in ms of the modules ``statement`` imported, and the heavy ones among them"""
+    probe = f"{statement}; import sys; print(','.join(m for m in {HEAVY!r} if m in sys.modules))"
+    proc = subprocess.run(  # nosec B603
+        [sys.executable, "-X", "importtime", "-c", probe],
+        capture_output=True,
+        text=True,
+        check=True,
+        env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"},
+    )
+    total = 0
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.removeprefix("import time:").split("|")
+        # only top level entries, their cumulative time already covers everything nested below
+        if not name.startswith("  "):
+            total += int(cumulative)
+    heavy = [m for m in proc.stdout.strip().split(",") if m]
+    return total / 1000, heavy
+
+
+def baseline() -> float:
+    """Time for the interpreter's own startup imports, subtracted from every statement"""
+    return statistics.median(measure("pass")[0] for _ in range(RUNS))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--max-ms", type=float, default=None)
+    args = parser.parse_args()
+
+    base = baseline()
+    print(f"{'statement':<48} {'ms':>8}  heavy imports")
+    package_ms = 0.0
+    for statement in STATEMENTS:
+        results = [measure(statement) for _ in range(RUNS)]
+        ms = max(statistics.median(r[0] for r in results) - base, 0.0)
+        if statement == STATEMENTS[0]:
+            package_ms = ms
+        print(f"{statement:<48} {ms:>8.1f}  {', '.join(results[0][1]) or '-'}")
+    if args.max_ms is not None and package_ms > args.max_ms:
+        sys.exit(f"import ssm_parameter_config took {package_ms:.1f}ms, over the {args.max_ms}ms limit")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+"""Compare utils.lazy_dict against the old json -> yaml -> env probing, across formats and sizes.
+
+Note the old probing never reached the env parser for well formed env files (yaml reads them as
+one plain string), so its env column is the cost of a wrong answer.
+
+Run with ``python benchmarks/bench_lazy_dict.py``.
+"""
+from __future__ import annotations
+
+import json
+import timeit
+from io import StringIO
+
+import dotenv
+from ruamel.yaml import YAMLError
+
+from ssm_parameter_config._yaml import yaml
+from ssm_parameter_config.utils import lazy_dict
+
+SIZES = (10, 100, 1000, 10000)
+
+
+def legacy_lazy_dict(value):
+    try:
+        return json.loads(value)
+    except json.decoder.JSONDecodeError:
+        pass
+    try:
+        return yaml.load(value)
+    except YAMLError:
+        pass
+    return dict(dotenv.dotenv_values(stream=StringIO(value)))
+
+
+def make_value(fmt: str, n: int) -> str:
+    data = {f"key_{i}": f"value number {i}" for i in range(n)}
+    if fmt == "json":
+        return json.dumps(data)
+    if fmt == "yaml":
+        return "".join(f"{k}: {v}\n" for k, v in data.items())
+    return "".join(f"{k.upper()}='{v}'\n" for k, v in data.items())
+
+
+def bench(func, value) -> float:
+    number, total = timeit.Timer(lambda: func(value)).autorange()
+    return total / number
+
+
+def main():
+    print(f"{'format':<6} {'keys':>6} {'legacy ms':>10} {'sniffed ms':>11} {'safe ms':>9} {'speedup':>8}")
+    for fmt in ("json", "yaml", "env"):
+        for n in SIZES:
+            value = make_value(fmt, n)
+            legacy = bench(legacy_lazy_dict, value)
+            sniffed = bench(lazy_dict, value)
+            safe = bench(lambda v: lazy_dict(v, round_trip=False), value)
+            print(
+                f"{fmt:<6} {n:>6} {legacy * 1e3:>10.3f} {sniffed * 1e3:>11.3f} {safe * 1e3:>9.3f}"
+                f" {legacy / min(sniffed, safe):>7.1f}x",
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,395 @@
+# -*- coding: utf-8 -*-
+"""Offline benchmark suite for the hot paths, with machine readable results.
+
+Covers ``SSMParameter.get_parameter``, ``SSMPath`` tree loading, ``lazy_dict`` per format,
+``SSMConfig.from_object`` with many registered classes, ``export`` per format and
+``decoded_value`` for encoded blobs. Nothing talks to AWS: by default SSM is an in-process stub
+that serves the same response shapes botocore does, so the numbers are the package's own cost;
+``--backend moto`` goes through botocore and moto instead, end to end but dominated by moto.
+
+Every case reports per-operation seconds (min / median / mean over ``--repeat`` rounds, each
+round timed over enough calls to last ~0.2s). Results are written as JSON with ``--output``;
+``--compare`` prints the change against an earlier results file, and with ``--max-slowdown X``
+exits non-zero when any case's median got more than X times slower, for use in CI.
+
+Run with ``python benchmarks/run_benchmarks.py [--quick] [--output results.json]``.
+"""
+from __future__ import annotations
+
+import argparse
+import base64
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import timeit
+from datetime import datetime, timezone
+from typing import Any, Callable, Iterator, Optional
+
+from pydantic import create_model
+
+import ssm_parameter_config
+from ssm_parameter_config import SSMConfig, SSMParameter, SSMPath
+from ssm_parameter_config.cache import parameter_cache
+from ssm_parameter_config.clients import clear_clients, set_ssm_client
+from ssm_parameter_config.codec import _codecs, encode_value
+from ssm_parameter_config.ratelimit import rate_limiter
+from ssm_parameter_config.utils import lazy_dict
+
+ROOT = "/bench"
+TREE_SIZES = (100, 1000, 10000)
+DOC_SIZES = (10, 100, 1000)
+CLASS_COUNTS = (10, 100, 500)
+BLOB_SIZES = (16 * 1024, 256 * 1024)
+QUICK_TREE_SIZES = (100, 1000)
+QUICK_DOC_SIZES = (10, 100)
+QUICK_CLASS_COUNTS = (10, 100)
+NOW = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+class _ParameterNotFound(Exception):
+    pass
+
+
+class _Exceptions:
+    ParameterNotFound = _ParameterNotFound
+    InvalidResourceId = _ParameterNotFound
+
+
+class _Paginator:
+    def __init__(self, method: Callable[..., dict[str, Any]]):
+        self.method = method
+
+    def paginate(self, **kwargs) -> Iterator[dict[str, Any]]:
+        token = None
+        while True:
+            page = self.method(**kwargs, **({"NextToken": token} if token else {}))
+            yield page
+            token = page.get("NextToken")
+            if not token:
+                return
+
+
+class StubSSM:
+    """Just enough of the SSM client for the calls the package makes, served from a dict"""
+
+    exceptions = _Exceptions
+
+    def __init__(self):
+        self.params: dict[str, dict[str, Any]] = {}
+        # full (unpaged) listings by their arguments, so paging through one doesn't rescan every parameter
+        self._listings: dict[tuple, list[dict[str, Any]]] = {}
+
+    def put_parameter(self, Name, Value, Type="String", Overwrite=False, **kwargs):  # pylint:disable=invalid-name
+        old = self.params.get(Name)
+        version = 1 if old is None else old["Version"] + 1
+        self._listings.clear()
+        self.params[Name] = {
+            "Name": Name,
+            "Value": Value,
+            "Type": Type,
+            "Version": version,
+            "LastModifiedDate": NOW,
+            "DataType": kwargs.get("DataType", "text"),
+            "Tier": kwargs.get("Tier", "Standard"),
+            "Description": kwargs.get("Description"),
+            "AllowedPattern": kwargs.get("AllowedPattern"),
+        }
+        return {"Version": version, "Tier": self.params[Name]["Tier"]}
+
+    def _value(self, p: dict[str, Any]) -> dict[str, Any]:
+        return {k: p[k] for k in ("Name", "Type", "Value", "Version", "LastModifiedDate", "DataType")}
+
+    def _metadata(self, p: dict[str, Any]) -> dict[str, Any]:
+        meta = {k: v for k, v in p.items() if k != "Value" and v is not None}
+        meta["Policies"] = []
+        return meta
+
+    def get_parameter(self, Name, WithDecryption=False):  # pylint:disable=invalid-name,unused-argument
+        if Name not in self.params:
+            raise _ParameterNotFound(Name)
+        return {"Parameter": self._value(self.params[Name])}
+
+    def get_parameters(self, Names, WithDecryption=False):  # pylint:disable=invalid-name,unused-argument
+        found = [self._value(self.params[n]) for n in Names if n in self.params]
+        return {"Parameters": found, "InvalidParameters": [n for n in Names if n not in self.params]}
+
+    def _page(self, items: list[dict[str, Any]], size: int, token: Optional[str]) -> tuple[list, Optional[str]]:
+        start = int(token or 0)
+        end = start + size
+        return items[start:end], str(end) if end < len(items) else None
+
+    def _matches(self, name: str, filters: list[dict[str, Any]]) -> bool:
+        for f in filters:
+            values = f.get("Values", [])
+            if f["Key"] == "Name" and f.get("Option", "Equals") == "BeginsWith":
+                ok = any(name.startswith(v) for v in values)
+            elif f["Key"] == "Name":
+                ok = name in values
+            elif f["Key"] == "Path":
+                ok = any(_below(name, v, f.get("Option") == "Recursive") for v in values)
+            else:
+                ok = True
+            if not ok:
+                return False
+        return True
+
+    def describe_parameters(self, ParameterFilters=(), NextToken=None, **_):  # pylint:disable=invalid-name
+        key = ("describe", json.dumps(ParameterFilters, sort_keys=True))
+        if key not in self._listings:
+            self._listings[key] = [
+                self._metadata(p) for n, p in sorted(self.params.items()) if self._matches(n, ParameterFilters)
+            ]
+        page, token = self._page(self._listings[key], 50, NextToken)
+        return {"Parameters": page, **({"NextToken": token} if token else {})}
+
+    def get_parameters_by_path(self, Path, Recursive=False, NextToken=None, **_):  # pylint:disable=invalid-name
+        key = ("path", Path, Recursive)
+        if key not in self._listings:
+            self._listings[key] = [self._value(p) for n, p in sorted(self.params.items()) if _below(n, Path, Recursive)]
+        page, token = self._page(self._listings[key], 10, NextToken)
+        return {"Parameters": page, **({"NextToken": token} if token else {})}
+
+    def list_tags_for_resource(self, **_):
+        return {"TagList": []}
+
+    def get_paginator(self, operation: str) -> _Paginator:
+        return _Paginator(getattr(self, operation))
+
+
+def _below(name: str, path: str, recursive: bool) -> bool:
+    prefix = path.rstrip("/") + "/"
+    return name.startswith(prefix) and (recursive or "/" not in name.removeprefix(prefix))
+
+
+def stub_backend() -> Callable[[], None]:
+    set_ssm_client(StubSSM())
+    return clear_clients
+
+
+def moto_backend() -> Callable[[], None]:
+    from moto import mock_ssm  # pylint:disable=import-outside-toplevel
+
+    os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+    os.environ.setdefault("AWS_ACCESS_KEY_ID", "testing")
+    os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "testing")
+    mock = mock_ssm()
+    mock.start()
+    clear_clients()
+    return mock.stop
+
+
+BACKENDS = {"stub": stub_backend, "moto": moto_backend}
+
+
+def measure(func: Callable[[], Any], repeat: int) -> dict[str, float]:
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    times = [t / number for t in timer.repeat(repeat=repeat, number=number)]
+    return {
+        "min": min(times),
+        "median": statistics.median(times),
+        "mean": statistics.fmean(times),
+        "ops": 1 / statistics.median(times),
+        "number": number,
+        "repeat": repeat,
+    }
+
+
+def populate(n: int, prefix: str = ROOT):
+    ssm = SSMPath(name=prefix).ssm_client
+    # /bench/<n>/app_<i % 20>/env_<i % 5>/param_<i>, so trees of different sizes don't overlap
+    for i in range(n):
+        ssm.put_parameter(Name=f"{prefix}/{n}/app_{i % 20}/env_{i % 5}/param_{i}", Value=f"value {i}", Type="String")
+
+
+def make_doc(fmt: str, n: int) -> str:
+    data = {f"key_{i}": f"value number {i}" for i in range(n)}
+    if fmt == "json":
+        return json.dumps(data)
+    if fmt == "yaml":
+        return "".join(f"{k}: {v}\n" for k, v in data.items())
+    return "".join(f"{k.upper()}='{v}'\n" for k, v in data.items())
+
+
+def bench_get_parameter(repeat: int) -> Iterator[dict[str, Any]]:
+    name = f"{ROOT}/single/param"
+    SSMPath(name=ROOT).ssm_client.put_parameter(Name=name, Value="value", Type="String")
+    SSMParameter.get_parameter(name)
+    yield case("get_parameter", {"cached": True}, lambda: SSMParameter.get_parameter(name), repeat)
+    yield case("get_parameter", {"cached": False}, lambda: SSMParameter.get_parameter(name, use_cache=False), repeat)
+    yield case(
+        "get_parameter",
+        {"cached": False, "missing": True},
+        lambda: SSMParameter.get_parameter(f"{ROOT}/single/missing", use_cache=False),
+        repeat,
+    )
+
+
+def bench_tree(sizes: tuple[int, ...], repeat: int) -> Iterator[dict[str, Any]]:
+    for n in sizes:
+        populate(n)
+        for values_only in (False, True):
+
+            def load(n=n, values_only=values_only):
+                SSMPath(name=f"{ROOT}/{n}").fetch_parameters(values_only=values_only)
+
+            yield case("tree_load", {"parameters": n, "values_only": values_only}, load, repeat)
+
+
+def bench_lazy_dict(sizes: tuple[int, ...], repeat: int) -> Iterator[dict[str, Any]]:
+    for fmt in ("json", "yaml", "env"):
+        for n in sizes:
+            value = make_doc(fmt, n)
+            yield case("lazy_dict", {"format": fmt, "keys": n}, lambda v=value: lazy_dict(v), repeat)
+            yield case(
+                "lazy_dict",
+                {"format": fmt, "keys": n, "round_trip": False},
+                lambda v=value: lazy_dict(v, round_trip=False),
+                repeat,
+            )
+
+
+def bench_from_object(counts: tuple[int, ...], repeat: int) -> Iterator[dict[str, Any]]:
+    # registered classes can't be dropped again, so each count adds to the ones before it
+    registered = 0
+    for count in counts:
+        while registered < count:
+            create_model(
+                f"BenchConfig{registered}",
+                __base__=SSMConfig,
+                **{"shared": (str, ...), f"field_{registered}": (str, ...), "count": (int, 0)},
+            )
+            registered += 1
+        first = {"shared": "x", "field_0": "y", "count": 1}
+        newest = {"shared": "x", f"field_{registered - 1}": "y", "count": 1}
+        yield case(
+            "from_object", {"classes": count, "match": "oldest"}, lambda o=first: SSMConfig.from_object(o), repeat
+        )
+        yield case(
+            "from_object", {"classes": count, "match": "newest"}, lambda o=newest: SSMConfig.from_object(o), repeat
+        )
+
+
+def bench_export(sizes: tuple[int, ...], repeat: int) -> Iterator[dict[str, Any]]:
+    for n in sizes:
+        model = create_model(
+            f"BenchExport{n}",
+            __base__=SSMConfig,
+            nested=(dict, {}),
+            **{f"field_{i}": (str, "") for i in range(n)},
+        )
+        values = {f"field_{i}": f"value {i}" for i in range(n)}
+        config = model(nested={f"k{i}": [i, str(i)] for i in range(10)}, **values)
+        for fmt in ("yaml", "json", "env"):
+            yield case("export", {"format": fmt, "fields": n}, lambda c=config, f=fmt: c.export(f), repeat)
+        params = {"format": "yaml", "fields": n, "ssm_format": True}
+        yield case("export", params, lambda c=config: c.export(ssm_format=True), repeat)
+
+
+def bench_decoded_value(sizes: tuple[int, ...], repeat: int) -> Iterator[dict[str, Any]]:
+    rng = random.Random(0)
+    for size in sizes:
+        # half random, half repetitive, so the blob compresses about as well as real configs
+        raw = base64.b64encode(rng.randbytes(size // 4)).decode("ascii")[: size // 2] + "key: value\n" * (size // 22)
+        for codec in sorted(_codecs):
+            param = SSMParameter(Name=f"{ROOT}/blob", Value=encode_value(raw, codec))
+
+            def decode(param=param):
+                # no version, so decode_cache is skipped; reset the per-parameter cache too
+                param._decoded_value = None  # pylint:disable=protected-access
+                return param.decoded_value
+
+            yield case(
+                "decoded_value", {"codec": codec, "bytes": size, "encoded_bytes": len(param.value)}, decode, repeat
+            )
+
+
+def case(name: str, params: dict[str, Any], func: Callable[[], Any], repeat: int) -> dict[str, Any]:
+    result = {"name": name, "params": params, **measure(func, repeat)}
+    print(f"{name:<14} {json.dumps(params, sort_keys=True):<62} {result['median'] * 1e3:>10.3f} ms", file=sys.stderr)
+    return result
+
+
+def case_key(result: dict[str, Any]) -> str:
+    return f"{result['name']} {json.dumps(result['params'], sort_keys=True)}"
+
+
+def compare(results: list[dict[str, Any]], baseline_path: str, backend: str) -> float:
+    """Print each case's median against the baseline file to stderr; returns the worst slowdown"""
+    with open(baseline_path, encoding="utf8") as fp:
+        data = json.load(fp)
+    # stdout may be carrying the results json
+    out = sys.stderr
+    if data["meta"]["backend"] != backend:
+        print(f"note: the baseline ran on the {data['meta']['backend']} backend, this run on {backend}", file=out)
+    baseline = {case_key(r): r for r in data["results"]}
+    worst = 0.0
+    print(f"{'case':<78} {'base ms':>10} {'now ms':>10} {'ratio':>7}", file=out)
+    for r in results:
+        old = baseline.get(case_key(r))
+        if old is None:
+            continue
+        ratio = r["median"] / old["median"]
+        worst = max(worst, ratio)
+        print(f"{case_key(r):<78} {old['median'] * 1e3:>10.3f} {r['median'] * 1e3:>10.3f} {ratio:>6.2f}x", file=out)
+    return worst
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--backend", choices=sorted(BACKENDS), default="stub")
+    parser.add_argument("--quick", action="store_true", help="smaller sizes, for a fast smoke run")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--only", action="append", default=None, help="only run these cases (repeatable)")
+    parser.add_argument("--output", default=None, help="write the results here as JSON")
+    parser.add_argument("--compare", default=None, help="results JSON of an earlier run to compare against")
+    parser.add_argument("--max-slowdown", type=float, default=None)
+    args = parser.parse_args()
+
+    rate_limiter.enabled = False
+    stop = BACKENDS[args.backend]()
+    suites = {
+        "get_parameter": lambda: bench_get_parameter(args.repeat),
+        "tree_load": lambda: bench_tree(QUICK_TREE_SIZES if args.quick else TREE_SIZES, args.repeat),
+        "lazy_dict": lambda: bench_lazy_dict(QUICK_DOC_SIZES if args.quick else DOC_SIZES, args.repeat),
+        "from_object": lambda: bench_from_object(QUICK_CLASS_COUNTS if args.quick else CLASS_COUNTS, args.repeat),
+        "export": lambda: bench_export(QUICK_DOC_SIZES if args.quick else DOC_SIZES, args.repeat),
+        "decoded_value": lambda: bench_decoded_value(BLOB_SIZES, args.repeat),
+    }
+    results = []
+    try:
+        for name, suite in suites.items():
+            if args.only is None or name in args.only:
+                results.extend(suite())
+    finally:
+        stop()
+        parameter_cache.invalidate()
+
+    output = {
+        "meta": {
+            "version": ssm_parameter_config.__version__,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "backend": args.backend,
+            "quick": args.quick,
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf8") as fp:
+            json.dump(output, fp, indent=2)
+    else:
+        json.dump(output, sys.stdout, indent=2)
+        print()
+    if args.compare:
+        worst = compare(results, args.compare, args.backend)
+        if args.max_slowdown is not None and worst > args.max_slowdown:
+            sys.exit(f"slowest case got {worst:.2f}x slower, over the {args.max_slowdown}x limit")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,27 @@
 # -*- coding: utf-8 -*-
-from .ssm_config import SSMConfig
-from .ssm_parameter import SSMParameter, SSMPath
+import importlib
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .ssm_config import SSMConfig
+    from .ssm_parameter import SSMParameter, SSMPath
 
 __version__: str = "1.1.3"
 
 __all__ = ["SSMConfig", "SSMParameter", "SSMPath"]
+
+# the public classes are imported on first access, so that just importing the package (or one of
+# its lightweight modules) doesn't pull in pydantic models, boto3 and the rest up front
+_LAZY_ATTRS = {"SSMConfig": ".ssm_config", "SSMParameter": ".ssm_parameter", "SSMPath": ".ssm_parameter"}
+
+
+def __getattr__(name: str):
+    if name in _LAZY_ATTRS:
+        value = getattr(importlib.import_module(_LAZY_ATTRS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
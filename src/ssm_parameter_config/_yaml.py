@@ -1,17 +1,50 @@
 # -*- coding: utf-8 -*-
+# ruamel.yaml is imported on first use, so importing the package doesn't pay for it
+import functools
 from typing import Mapping
 
 from pydantic.json import pydantic_encoder
-from ruamel.yaml import YAML
-from ruamel.yaml.scalarstring import LiteralScalarString
 
-yaml = YAML()
-yaml.default_flow_style = False
-yaml.width = 120  # type: ignore
-yaml.sequence_dash_offset = 2
+
+@functools.lru_cache(maxsize=None)
+def get_yaml():
+    from ruamel.yaml import YAML  # pylint:disable=import-outside-toplevel
+
+    yaml = YAML()
+    yaml.default_flow_style = False
+    yaml.width = 120  # type: ignore
+    yaml.sequence_dash_offset = 2
+    return yaml
+
+
+@functools.lru_cache(maxsize=None)
+def get_yaml_safe():
+    """For loading when round trip fidelity isn't needed; uses the C parser when ruamel.yaml.clib is available"""
+    from ruamel.yaml import YAML  # pylint:disable=import-outside-toplevel
+
+    return YAML(typ="safe")
+
+
+def yaml_error() -> type[Exception]:
+    from ruamel.yaml import YAMLError  # pylint:disable=import-outside-toplevel
+
+    return YAMLError
+
+
+def __getattr__(name: str):
+    # the module level instances this module used to build at import time
+    if name == "yaml":
+        return get_yaml()
+    if name == "yaml_safe":
+        return get_yaml_safe()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def encode_for_yaml(obj):
+    from ruamel.yaml.scalarstring import (  # pylint:disable=import-outside-toplevel
+        LiteralScalarString,
+    )
+
     if isinstance(obj, Mapping):
         return {k: encode_for_yaml(v) for k, v in obj.items()}
     if isinstance(obj, (list, tuple)):
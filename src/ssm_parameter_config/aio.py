@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+# helpers for running the blocking boto3 calls off the event loop with bounded parallelism;
+# asyncio is imported inside them, since only async callers need it
+from __future__ import annotations
+
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Iterable, Optional, TypeVar
+
+if TYPE_CHECKING:
+    import asyncio
+
+T = TypeVar("T")
+
+_lock = threading.Lock()
+_executor: Optional[ThreadPoolExecutor] = None
+_max_concurrency: int = 10
+_semaphores: dict[asyncio.AbstractEventLoop, asyncio.Semaphore] = {}
+
+
+def configure_async(max_concurrency: int = 10):
+    """Set how many blocking SSM calls may run at once from async code"""
+    global _executor, _max_concurrency  # pylint:disable=global-statement
+    with _lock:
+        _max_concurrency = max_concurrency
+        old, _executor = _executor, None
+        _semaphores.clear()
+    if old is not None:
+        old.shutdown(wait=False)
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor  # pylint:disable=global-statement
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=_max_concurrency, thread_name_prefix="ssm-parameter-config")
+        return _executor
+
+
+def _get_semaphore(loop: asyncio.AbstractEventLoop) -> asyncio.Semaphore:
+    import asyncio  # pylint:disable=import-outside-toplevel,redefined-outer-name
+
+    with _lock:
+        if loop not in _semaphores:
+            for old_loop in [lp for lp in _semaphores if lp.is_closed()]:
+                del _semaphores[old_loop]
+            _semaphores[loop] = asyncio.Semaphore(_max_concurrency)
+        return _semaphores[loop]
+
+
+async def run_sync(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run ``func`` in the shared worker pool, waiting for a free slot first"""
+    import asyncio  # pylint:disable=import-outside-toplevel,redefined-outer-name
+
+    loop = asyncio.get_running_loop()
+    async with _get_semaphore(loop):
+        return await loop.run_in_executor(_get_executor(), functools.partial(func, *args, **kwargs))
+
+
+async def gather_sync(calls: Iterable[Callable[[], T]]) -> list[T]:
+    """Run several blocking callables concurrently (bounded by the pool size), keeping their order"""
+    import asyncio  # pylint:disable=import-outside-toplevel,redefined-outer-name
+
+    awaitables: list[Awaitable[T]] = [run_sync(c) for c in calls]
+    return list(await asyncio.gather(*awaitables))
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, NamedTuple, Optional
+
+_MISSING = object()
+
+
+class CacheStats(NamedTuple):
+    hits: int
+    misses: int
+    size: int
+    maxsize: Optional[int]
+    ttl: Optional[float]
+
+
+class ParameterCache:
+    """Thread safe in-memory cache with TTL expiry and LRU eviction.
+
+    A ``ttl`` of ``None`` never expires entries, a ``maxsize`` of ``None`` never evicts them,
+    and a ``ttl`` or ``maxsize`` of ``0`` disables the cache entirely.
+    """
+
+    def __init__(self, ttl: Optional[float] = 60.0, maxsize: Optional[int] = 256):
+        self._lock = threading.RLock()
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl != 0 and self.maxsize != 0
+
+    def configure(self, ttl: Optional[float] = 60.0, maxsize: Optional[int] = 256):
+        with self._lock:
+            self.ttl = ttl
+            self.maxsize = maxsize
+            if not self.enabled:
+                self._data.clear()
+            self._evict()
+
+    def get(self, key: Hashable, default: Any = _MISSING) -> Any:
+        with self._lock:
+            try:
+                expires, value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            if expires < time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def peek(self, key: Hashable, default: Any = None) -> Any:
+        """Like :meth:`get`, but neither counted in the stats nor marking the entry as recently used"""
+        with self._lock:
+            item = self._data.get(key)
+            return default if item is None or item[0] < time.monotonic() else item[1]
+
+    def set(self, key: Hashable, value: Any):
+        if not self.enabled:
+            return
+        expires = float("inf") if self.ttl is None else time.monotonic() + self.ttl
+        with self._lock:
+            self._data[key] = (expires, value)
+            self._data.move_to_end(key)
+            self._evict()
+
+    def invalidate(self, key: Optional[Hashable] = None):
+        """Drop ``key`` from the cache, or everything if no key is given"""
+        with self._lock:
+            if key is None:
+                self._data.clear()
+            else:
+                self._data.pop(key, None)
+
+    def reset_stats(self):
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(self.hits, self.misses, len(self._data), self.maxsize, self.ttl)
+
+    def _evict(self):
+        if self.maxsize is None:
+            return
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            item = self._data.get(key)
+            return item is not None and item[0] >= time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+parameter_cache = ParameterCache()
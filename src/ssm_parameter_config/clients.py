@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+
+import threading
+from typing import TYPE_CHECKING, Any, Hashable, Optional
+
+from .instrument import instrumentation
+from .ratelimit import rate_limiter
+
+if TYPE_CHECKING:
+    import boto3
+    from botocore.client import BaseClient
+
+# boto3 and botocore are only imported once a client is needed, to keep the package import cheap
+
+_lock = threading.RLock()
+_clients: dict[Hashable, BaseClient] = {}
+_session: Optional[boto3.session.Session] = None
+_max_pool_connections: int = 50
+_retries: dict[str, Any] = {"mode": "standard", "max_attempts": 8}
+
+
+def _client_key(region_name, profile_name, endpoint_url, kwargs) -> Optional[Hashable]:
+    key = (region_name, profile_name, endpoint_url, tuple(sorted(kwargs.items())))
+    try:
+        hash(key)
+    except TypeError:
+        return None
+    return key
+
+
+def client_errors() -> tuple[type[Exception], ...]:
+    """The botocore errors raised by failed SSM calls, for ``except client_errors():``"""
+    from botocore.exceptions import (  # pylint:disable=import-outside-toplevel
+        BotoCoreError,
+        ClientError,
+    )
+
+    return BotoCoreError, ClientError
+
+
+def configure_clients(max_pool_connections: int = 50, retry_mode: str = "standard", max_attempts: int = 8):
+    """Set the connection pool size and retry policy used for new clients, dropping any already built"""
+    global _max_pool_connections, _retries  # pylint:disable=global-statement
+    with _lock:
+        _max_pool_connections = max_pool_connections
+        _retries = {"mode": retry_mode, "max_attempts": max_attempts}
+        _clients.clear()
+
+
+def set_session(session: Optional[boto3.session.Session]):
+    """Build all future clients from ``session`` (``None`` goes back to a fresh default session)"""
+    global _session  # pylint:disable=global-statement
+    with _lock:
+        _session = session
+        _clients.clear()
+
+
+def set_ssm_client(
+    client: BaseClient,
+    region_name: Optional[str] = None,
+    profile_name: Optional[str] = None,
+    endpoint_url: Optional[str] = None,
+    **kwargs,
+):
+    """Register a prebuilt client, returned for any lookup with the same arguments"""
+    key = _client_key(region_name, profile_name, endpoint_url, kwargs)
+    if key is None:
+        raise ValueError("Client registry arguments must be hashable")
+    from botocore.client import (  # pylint:disable=import-outside-toplevel,redefined-outer-name
+        BaseClient,
+    )
+
+    if isinstance(client, BaseClient):
+        rate_limiter.attach(client)
+        instrumentation.attach(client)
+    with _lock:
+        _clients[key] = client
+
+
+def clear_clients():
+    with _lock:
+        _clients.clear()
+
+
+def _new_client(region_name, profile_name, endpoint_url, kwargs) -> BaseClient:
+    import boto3  # pylint:disable=import-outside-toplevel,redefined-outer-name
+    from botocore.config import Config  # pylint:disable=import-outside-toplevel
+
+    if profile_name is not None:
+        session = boto3.session.Session(profile_name=profile_name)
+    elif _session is not None:
+        session = _session
+    else:
+        session = boto3.session.Session()
+    config = Config(max_pool_connections=_max_pool_connections, retries=dict(_retries))
+    if "config" in kwargs:
+        config = config.merge(kwargs.pop("config"))
+    client = session.client("ssm", region_name=region_name, endpoint_url=endpoint_url, config=config, **kwargs)
+    # the exceptions namespace is built lazily and racily; build it now so every thread sees the same classes
+    client.exceptions  # pylint:disable=pointless-statement
+    rate_limiter.attach(client)
+    # after the rate limiter, so its waits aren't counted as call latency
+    instrumentation.attach(client)
+    return client
+
+
+def get_ssm_client(
+    region_name: Optional[str] = None,
+    profile_name: Optional[str] = None,
+    endpoint_url: Optional[str] = None,
+    **kwargs: Any,
+) -> BaseClient:
+    """Return a shared SSM client for the given region, profile and endpoint.
+
+    Clients are built once per distinct set of arguments and then reused, so their connection
+    pools survive across calls. Any extra keyword arguments are passed on to ``Session.client``.
+    """
+    key = _client_key(region_name, profile_name, endpoint_url, kwargs)
+    with _lock:
+        if key is not None and key in _clients:
+            return _clients[key]
+        # boto3 sessions aren't thread safe, so clients are built under the lock
+        client = _new_client(region_name, profile_name, endpoint_url, dict(kwargs))
+        if key is not None:
+            _clients[key] = client
+        return client
@@ -0,0 +1,209 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+
+import base64
+import functools
+import hashlib
+import importlib
+import importlib.util
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Callable, Hashable, NamedTuple, Optional, Sequence
+
+# values longer than this (the Standard tier limit) are encoded before being written
+ENCODE_THRESHOLD = 4096
+# encoded values look like "ssmcfg1:<codec>:<base64 payload>"; no curly braces, so SSM accepts them as is
+MAGIC = "ssmcfg1:"
+
+# values too big for one parameter are split over "<name>/_chunk/<n>" parameters, and the parameter
+# itself holds a manifest: "ssmchunks1:<count>:<sha256 of the joined chunks>"
+CHUNK_MAGIC = "ssmchunks1:"
+CHUNK_SIZE = 4096
+
+
+class Codec(NamedTuple):
+    name: str
+    encode: Callable[[bytes], bytes]
+    decode: Callable[[bytes], bytes]
+
+
+_codecs: dict[str, Codec] = {}
+
+
+def register_codec(name: str, encode: Callable[[bytes], bytes], decode: Callable[[bytes], bytes]):
+    if ":" in name or not name:
+        raise ValueError(f"Invalid codec name {name!r}")
+    _codecs[name] = Codec(name, encode, decode)
+
+
+def get_codec(name: str) -> Codec:
+    try:
+        return _codecs[name]
+    except KeyError:
+        raise ValueError(f"Unknown value codec {name!r}") from None
+
+
+def _load_signed(data: bytes) -> bytes:
+    from signed_pickle import DumperSigner  # pylint:disable=import-outside-toplevel
+
+    return DumperSigner.load(data)[0]
+
+
+def _signed(compressor: str, **compressor_kwargs) -> tuple[Callable[[bytes], bytes], Callable[[bytes], bytes]]:
+    """Compress then sign, with the compressor recorded in the signed header.
+
+    signed_pickle and the compressor module are only imported when a value is first encoded.
+    """
+
+    @functools.lru_cache(maxsize=None)
+    def signer():
+        from signed_pickle import DumperSigner  # pylint:disable=import-outside-toplevel
+
+        return DumperSigner(compressor=importlib.import_module(compressor), compressor_kwargs=compressor_kwargs)
+
+    return lambda data: signer().dump(data), _load_signed
+
+
+register_codec("zlib", *_signed("zlib", level=zlib.Z_BEST_COMPRESSION))
+if importlib.util.find_spec("zstandard") is not None:
+    register_codec("zstd", *_signed("zstandard", level=19))
+
+DEFAULT_CODEC = "zstd" if "zstd" in _codecs else "zlib"
+
+
+def is_encoded(value: str) -> bool:
+    return value.startswith(MAGIC)
+
+
+def encode_value(value: str, codec: Optional[str] = None, threshold: int = ENCODE_THRESHOLD) -> str:
+    """Encode ``value`` with ``codec`` (default: zstd if installed, else zlib) if it's over ``threshold``"""
+    if len(value) <= threshold:
+        return value
+    c = get_codec(codec or DEFAULT_CODEC)
+    return f"{MAGIC}{c.name}:{base64.b64encode(c.encode(value.encode('utf8'))).decode('ascii')}"
+
+
+# Values written before the codec header existed are bare base64 of a DumperSigner blob, which
+# always starts with its magic bytes, so its base64 always starts with these characters
+_LEGACY_MAGIC = b"\xd5\xd5"
+_LEGACY_PREFIX = base64.b64encode(_LEGACY_MAGIC).decode("ascii")[:2]
+
+
+def _maybe_legacy(value: str) -> bool:
+    return value.startswith(_LEGACY_PREFIX)
+
+
+def _decode(value: str) -> str:
+    if not is_encoded(value):
+        try:
+            data = base64.b64decode(value.strip(), validate=True)
+        except ValueError:  # binascii.Error is a ValueError
+            return value
+        if not data.startswith(_LEGACY_MAGIC):
+            return value
+        try:
+            return _load_signed(data).decode("utf8")
+        except Exception:  # pylint:disable=broad-except
+            # whatever a plain value that merely looks like a blob makes the loader raise
+            return value
+    name, _, payload = value.removeprefix(MAGIC).partition(":")
+    return get_codec(name).decode(base64.b64decode(payload, validate=True)).decode("utf8")
+
+
+class _DecodeCache:
+    """LRU of decoded values by (name, version), which SSM never reuses for different contents"""
+
+    def __init__(self, maxsize: int = 128):
+        self.maxsize = maxsize
+        self._data: OrderedDict[Hashable, tuple[str, str]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, value: str) -> Optional[str]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] != value:
+                return None
+            self._data.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: Hashable, value: str, decoded: str):
+        with self._lock:
+            self._data[key] = (value, decoded)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+decode_cache = _DecodeCache()
+
+
+class Manifest(NamedTuple):
+    chunks: int
+    sha256: str
+
+
+class ChunkError(ValueError):
+    """The chunks of a value are missing or don't match their manifest"""
+
+
+def chunk_name(name: str, index: int) -> str:
+    return f"{name}/_chunk/{index}"
+
+
+def is_chunk_name(name: str) -> bool:
+    """Whether ``name`` is one of the chunks of another parameter rather than a parameter of its own"""
+    return "/_chunk/" in name
+
+
+def split_chunks(value: str, size: int = CHUNK_SIZE) -> tuple[str, list[str]]:
+    """Split ``value`` into chunks, returning its manifest along with them"""
+    chunks: list[str] = []
+    for start in range(0, len(value), size):
+        end = start + size
+        chunks.append(value[start:end])
+    return f"{CHUNK_MAGIC}{len(chunks)}:{hashlib.sha256(value.encode('utf8')).hexdigest()}", chunks
+
+
+def parse_manifest(value: str) -> Optional[Manifest]:
+    if not value.startswith(CHUNK_MAGIC):
+        return None
+    count, _, digest = value.removeprefix(CHUNK_MAGIC).partition(":")
+    return Manifest(int(count), digest)
+
+
+def join_chunks(manifest: Manifest, chunks: Sequence[str]) -> str:
+    joined = "".join(chunks)
+    if len(chunks) != manifest.chunks or hashlib.sha256(joined.encode("utf8")).hexdigest() != manifest.sha256:
+        raise ChunkError("Chunks don't match their manifest; the value was probably rewritten while being read")
+    return joined
+
+
+def decode_value(
+    value: str,
+    cache_key: Optional[Hashable] = None,
+    read_chunks: Optional[Callable[[Manifest], str]] = None,
+) -> str:
+    """Decode a value written by :func:`encode_value` (or by older versions); plain values are returned as is.
+
+    Decoded values are cached under ``cache_key``, normally ``(name, version)``, when given.
+    Chunk manifests are resolved with ``read_chunks``, which returns the checked, joined chunks.
+    """
+    manifest = parse_manifest(value)
+    if manifest is None and not is_encoded(value) and not _maybe_legacy(value):
+        return value
+    if cache_key is not None and (cached := decode_cache.get(cache_key, value)) is not None:
+        return cached
+    if manifest is None:
+        decoded = _decode(value)
+    elif read_chunks is None:
+        raise ChunkError(f"Can't read the {manifest.chunks} chunks of a chunked value")
+    else:
+        decoded = decode_value(read_chunks(manifest))
+    if cache_key is not None:
+        decode_cache.set(cache_key, value, decoded)
+    return decoded
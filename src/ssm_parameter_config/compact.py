@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+
+from typing import Any, Iterable, Iterator, Optional, Union
+
+from pydantic import parse_obj_as
+from pydantic.utils import to_camel
+
+from .ssm_parameter import (
+    _METADATA_FIELDS,
+    _VALUE_FIELDS,
+    ParameterRecord,
+    SSMParameter,
+    SSMPath,
+)
+
+
+class CompactNode:
+    """One node of a :class:`CompactTree`: a directory, a parameter, or both.
+
+    ``record`` holds the parameter (``None`` for plain directories); ``children`` stays ``None``
+    until the node gets a child.
+    """
+
+    __slots__ = ("name", "record", "children")
+
+    def __init__(self, name: str, record: Optional[ParameterRecord] = None):
+        self.name = name
+        self.record = record
+        self.children: Optional[dict[str, CompactNode]] = None
+
+    def is_dir(self) -> bool:
+        return self.record is None
+
+    def is_file(self) -> bool:
+        return self.record is not None
+
+    def iterdir(self) -> Iterator[CompactNode]:
+        if self.children:
+            yield from self.children.values()
+
+    def __repr__(self) -> str:
+        return f"CompactNode({self.name!r}, record={self.record!r})"
+
+
+class CompactTree:
+    """Read-only tree of :class:`~ssm_parameter_config.ssm_parameter.ParameterRecord` below a path.
+
+    Nodes are plain ``__slots__`` objects and parameters stay as records, so building and holding
+    a large hierarchy costs a fraction of a :class:`~ssm_parameter_config.ssm_parameter.SSMPath`
+    tree. Use :meth:`to_parameter` or :meth:`to_path` to get full models where needed.
+    """
+
+    def __init__(self, name: str, fields: Iterable[str] = _VALUE_FIELDS):
+        self.root = CompactNode(name.rstrip("/") or "/")
+        self.fields = frozenset(fields)
+        self._prefix = f"{self.root.name.rstrip('/')}/"
+        self._count = 0
+
+    @classmethod
+    def load(
+        cls,
+        name: str,
+        fields: Optional[Iterable[str]] = None,
+        filters: Optional[list[dict[str, Any]]] = None,
+        **aws_client_kwargs: Any,
+    ) -> CompactTree:
+        """Stream every parameter below ``name`` into a new tree (see :meth:`SSMPath.iter_parameters`)"""
+        fields = _VALUE_FIELDS if fields is None else frozenset(fields) | {"name"}
+        path = SSMPath(name=name)
+        path.set_aws_client_kwargs(**aws_client_kwargs)
+        tree = cls(name, fields)
+        tree.extend(path.iter_parameters(fields=fields, filters=filters))
+        return tree
+
+    @classmethod
+    def from_path(cls, path: SSMPath) -> CompactTree:
+        """Compact copy of the parameters already loaded in ``path``"""
+        params = list(path.loaded_parameters())
+        got_metadata = all(p._got_metadata for p in params)  # pylint:disable=protected-access
+        tree = cls(path.name, _VALUE_FIELDS | set(_METADATA_FIELDS) if got_metadata else _VALUE_FIELDS)
+        # __dict__ so lazily loaded fields aren't fetched
+        tree.extend(ParameterRecord(*(p.__dict__[f] for f in ParameterRecord._fields)) for p in params)
+        return tree
+
+    def extend(self, records: Iterable[ParameterRecord]):
+        for record in records:
+            self.add(record)
+
+    def add(self, record: ParameterRecord):
+        if not record.name.startswith(self._prefix):
+            raise ValueError(f"{record.name} is not below {self.root.name}")
+        node = self.root
+        parts = record.name.removeprefix(self._prefix).split("/")
+        for part in parts[:-1]:
+            if node.children is None:
+                node.children = {}
+            child = node.children.get(part)
+            if child is None:
+                child = node.children[part] = CompactNode(f"{node.name.rstrip('/')}/{part}")
+            node = child
+        if node.children is None:
+            node.children = {}
+        leaf = node.children.get(parts[-1])
+        if leaf is None:
+            node.children[parts[-1]] = CompactNode(record.name, record)
+            self._count += 1
+        else:
+            self._count += leaf.record is None
+            leaf.record = record
+
+    def node(self, name: Union[str, tuple[str, ...]]) -> CompactNode:
+        """The node for a full parameter name, or for a tuple of parts relative to the root"""
+        parts = name if isinstance(name, tuple) else name.removeprefix(self._prefix).split("/")
+        node = self.root
+        for part in parts:
+            if not node.children or part not in node.children:
+                raise KeyError(name)
+            node = node.children[part]
+        return node
+
+    def __getitem__(self, name: Union[str, tuple[str, ...]]) -> ParameterRecord:
+        record = self.node(name).record
+        if record is None:
+            raise KeyError(name)
+        return record
+
+    def __contains__(self, name: str) -> bool:
+        try:
+            self[name]
+        except KeyError:
+            return False
+        return True
+
+    def __len__(self) -> int:
+        return self._count
+
+    def records(self) -> Iterator[ParameterRecord]:
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            if node.record is not None:
+                yield node.record
+            if node.children:
+                stack.extend(reversed(node.children.values()))
+
+    def iterdir(self) -> Iterator[CompactNode]:
+        return self.root.iterdir()
+
+    def to_parameter(self, name: Union[str, ParameterRecord]) -> SSMParameter:
+        """Full model for one parameter; fields that weren't loaded are fetched lazily as usual"""
+        record = name if isinstance(name, ParameterRecord) else self[name]
+        data = {to_camel(k): v for k, v in record._asdict().items() if v is not None}
+        param = parse_obj_as(SSMParameter, data)
+        param._got_metadata = self.fields.issuperset(_METADATA_FIELDS)  # pylint:disable=protected-access
+        return param
+
+    def to_path(self) -> SSMPath:
+        """Convert the whole tree to an :class:`SSMPath` hierarchy"""
+        root = SSMPath(name=self.root.name)
+        root._listed = True  # pylint:disable=protected-access
+        root._insert_parameters(map(self.to_parameter, self.records()))  # pylint:disable=protected-access
+        return root
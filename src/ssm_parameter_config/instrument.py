@@ -0,0 +1,276 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+
+import bisect
+import logging
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Callable, NamedTuple, Optional
+
+from .ratelimit import THROTTLE_CODES
+
+if TYPE_CHECKING:
+    from botocore.client import BaseClient
+
+logger = logging.getLogger()
+
+# upper bounds in seconds of the latency histogram buckets; the last one catches everything slower
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, float("inf"))
+
+_CONTEXT_KEY = "ssm_parameter_config_instrument"
+
+
+class InstrumentEvent(NamedTuple):
+    """Something that was timed.
+
+    ``kind`` is one of ``api`` (one SSM call, retries included), ``source`` (AwsSSMSettings loading
+    a config), ``parse`` (a parameter's value parsed to a dict), ``validate`` (a config or a tree's
+    parameters validated by pydantic), ``tree_load`` (an SSMPath listing) or ``put`` (a parameter
+    write). ``operation`` is the API operation, format, class or write action.
+    """
+
+    kind: str
+    operation: str
+    name: Optional[str]
+    duration: float
+    bytes_sent: int = 0
+    bytes_received: int = 0
+    throttles: int = 0
+    error: Optional[str] = None
+    items: int = 1  # things handled, e.g. parameters in a tree load
+
+
+Hook = Callable[[InstrumentEvent], None]
+
+
+class Instrumentation:
+    """Hands timed events to the installed hooks; does nothing until the first hook is added.
+
+    Timing sites call :meth:`start`, which is ``None`` while disabled, and pass its result to
+    :meth:`record`, so the cost without hooks is one attribute check per site.
+    """
+
+    def __init__(self):
+        self._hooks: tuple[Hook, ...] = ()
+        self._lock = threading.Lock()
+        self.enabled = False
+
+    def add_hook(self, hook: Hook):
+        with self._lock:
+            if hook not in self._hooks:
+                self._hooks += (hook,)
+            self.enabled = True
+
+    def remove_hook(self, hook: Hook):
+        with self._lock:
+            self._hooks = tuple(h for h in self._hooks if h != hook)
+            self.enabled = bool(self._hooks)
+
+    def start(self) -> Optional[float]:
+        return time.perf_counter() if self.enabled else None
+
+    def record(self, kind: str, operation: str, start: Optional[float], name: Optional[str] = None, **fields: Any):
+        """Emit an event timed from ``start``; a no-op when ``start`` is ``None``"""
+        if start is None:
+            return
+        self.emit(InstrumentEvent(kind, operation, name, time.perf_counter() - start, **fields))
+
+    def emit(self, event: InstrumentEvent):
+        for hook in self._hooks:
+            try:
+                hook(event)
+            except Exception:  # pylint:disable=broad-except
+                # a broken hook mustn't break the call it's watching
+                logger.exception("Instrumentation hook %r failed", hook)
+
+    def attach(self, client: BaseClient):
+        events = client.meta.events
+        for event, handler in (
+            ("before-parameter-build", self._before_build),
+            ("before-call", self._before_call),
+            ("needs-retry", self._needs_retry),
+            ("after-call", self._after_call),
+            ("after-call-error", self._after_call_error),
+        ):
+            events.register(f"{event}.ssm", handler, unique_id=f"ssm-parameter-config-instrument-{event}")
+
+    def _before_build(self, params: Any = None, context: Any = None, **_kwargs):
+        if not self.enabled or context is None:
+            return
+        params = params or {}
+        name = params.get("Name") or params.get("Path") or params.get("ResourceId")
+        context[_CONTEXT_KEY] = {"name": name, "throttles": 0}
+
+    def _before_call(self, params: Any = None, context: Any = None, **_kwargs):
+        # runs after the rate limiter's handler, so time spent waiting for a token isn't counted
+        state = None if context is None else context.get(_CONTEXT_KEY)
+        if state is None:
+            return
+        body = (params or {}).get("body") or b""
+        state["bytes_sent"] = len(body)
+        state["start"] = time.perf_counter()
+
+    def _needs_retry(self, response: Any = None, request_dict: Any = None, **_kwargs):
+        if not self.enabled or response is None or request_dict is None:
+            return None
+        state = request_dict.get("context", {}).get(_CONTEXT_KEY)
+        if state is not None and response[1].get("Error", {}).get("Code") in THROTTLE_CODES:
+            state["throttles"] += 1
+        return None
+
+    def _after_call(self, model: Any, http_response: Any = None, parsed: Any = None, context: Any = None, **_kwargs):
+        state = None if context is None else context.pop(_CONTEXT_KEY, None)
+        if state is None or "start" not in state:
+            return
+        content = getattr(http_response, "content", None) or b""
+        self.emit(
+            InstrumentEvent(
+                "api",
+                model.name,
+                state["name"],
+                time.perf_counter() - state["start"],
+                bytes_sent=state["bytes_sent"],
+                bytes_received=len(content),
+                throttles=state["throttles"],
+                error=(parsed or {}).get("Error", {}).get("Code"),
+            )
+        )
+
+    def _after_call_error(self, model: Any, exception: Any = None, context: Any = None, **_kwargs):
+        state = None if context is None else context.pop(_CONTEXT_KEY, None)
+        if state is None or "start" not in state:
+            return
+        self.emit(
+            InstrumentEvent(
+                "api",
+                model.name,
+                state["name"],
+                time.perf_counter() - state["start"],
+                bytes_sent=state["bytes_sent"],
+                throttles=state["throttles"],
+                error=type(exception).__name__,
+            )
+        )
+
+
+class OperationStats(NamedTuple):
+    calls: int
+    errors: int
+    throttles: int
+    items: int  # things handled, e.g. parameters in a tree load; equals calls for single item events
+    bytes_sent: int
+    bytes_received: int
+    total_time: float
+    max_time: float
+    histogram: tuple[int, ...]  # calls per LATENCY_BUCKETS bucket
+
+    @property
+    def mean_time(self) -> float:
+        return self.total_time / self.calls if self.calls else 0.0
+
+    def percentile(self, q: float) -> float:
+        """Upper bound of the histogram bucket holding the ``q`` (0-1) quantile"""
+        target = q * self.calls
+        seen = 0
+        for bound, n in zip(LATENCY_BUCKETS, self.histogram):
+            seen += n
+            if seen >= target and n:
+                return bound
+        return 0.0
+
+
+class _Accumulator:
+    __slots__ = ("calls", "errors", "throttles", "items", "bytes_sent", "bytes_received", "total", "max", "histogram")
+
+    def __init__(self):
+        self.calls = self.errors = self.throttles = self.items = self.bytes_sent = self.bytes_received = 0
+        self.total = self.max = 0.0
+        self.histogram = [0] * len(LATENCY_BUCKETS)
+
+    def add(self, event: InstrumentEvent):
+        self.calls += 1
+        self.errors += event.error is not None
+        self.throttles += event.throttles
+        self.items += event.items
+        self.bytes_sent += event.bytes_sent
+        self.bytes_received += event.bytes_received
+        self.total += event.duration
+        self.max = max(self.max, event.duration)
+        self.histogram[bisect.bisect_left(LATENCY_BUCKETS, event.duration)] += 1
+
+    def stats(self) -> OperationStats:
+        return OperationStats(
+            self.calls,
+            self.errors,
+            self.throttles,
+            self.items,
+            self.bytes_sent,
+            self.bytes_received,
+            self.total,
+            self.max,
+            tuple(self.histogram),
+        )
+
+
+class StatsCollector:
+    """Hook aggregating events by ``(kind, operation)``, and parse / validate times by parameter name"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._operations: dict[tuple[str, str], _Accumulator] = {}
+        self._parameters: dict[tuple[str, str], _Accumulator] = {}
+
+    def __call__(self, event: InstrumentEvent):
+        with self._lock:
+            key = (event.kind, event.operation)
+            acc = self._operations.get(key)
+            if acc is None:
+                acc = self._operations[key] = _Accumulator()
+            acc.add(event)
+            if event.kind in ("parse", "validate") and event.name is not None:
+                key = (event.kind, event.name)
+                acc = self._parameters.get(key)
+                if acc is None:
+                    acc = self._parameters[key] = _Accumulator()
+                acc.add(event)
+
+    def operations(self, kind: Optional[str] = None) -> dict[tuple[str, str], OperationStats]:
+        with self._lock:
+            return {k: a.stats() for k, a in self._operations.items() if kind is None or k[0] == kind}
+
+    def parameters(self, kind: Optional[str] = None) -> dict[tuple[str, str], OperationStats]:
+        """Parse and validation stats by ``(kind, parameter name)``"""
+        with self._lock:
+            return {k: a.stats() for k, a in self._parameters.items() if kind is None or k[0] == kind}
+
+    def summary(self) -> dict[str, Any]:
+        """Everything collected so far, plus the cache stats, as plain data (e.g. for logging as JSON)"""
+        from .cache import parameter_cache  # pylint:disable=import-outside-toplevel
+
+        def flatten(stats: dict[tuple[str, str], OperationStats]) -> dict[str, Any]:
+            return {f"{k[0]}:{k[1]}": {**s._asdict(), "mean_time": s.mean_time} for k, s in stats.items()}
+
+        return {
+            "operations": flatten(self.operations()),
+            "parameters": flatten(self.parameters()),
+            "parameter_cache": parameter_cache.stats()._asdict(),
+        }
+
+    def reset(self):
+        with self._lock:
+            self._operations.clear()
+            self._parameters.clear()
+
+
+instrumentation = Instrumentation()
+stats_collector = StatsCollector()
+
+
+def enable_stats() -> StatsCollector:
+    """Start collecting into :data:`stats_collector`, and return it"""
+    instrumentation.add_hook(stats_collector)
+    return stats_collector
+
+
+def disable_stats():
+    instrumentation.remove_hook(stats_collector)
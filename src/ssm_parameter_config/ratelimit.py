@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+
+import logging
+import random
+import threading
+import time
+from typing import TYPE_CHECKING, Any, NamedTuple, Optional
+
+if TYPE_CHECKING:
+    from botocore.client import BaseClient
+
+logger = logging.getLogger()
+
+# SSM throttles these groups of calls separately, so each gets its own budget
+OPERATION_FAMILIES = {
+    "GetParameter": "get",
+    "GetParameters": "get",
+    "GetParametersByPath": "get",
+    "GetParameterHistory": "get",
+    "DescribeParameters": "describe",
+    "PutParameter": "put",
+    "DeleteParameter": "put",
+    "DeleteParameters": "put",
+    "LabelParameterVersion": "put",
+    "ListTagsForResource": "tags",
+    "AddTagsToResource": "tags",
+    "RemoveTagsFromResource": "tags",
+}
+# (requests per second, burst size)
+DEFAULT_RATES = {
+    "get": (40.0, 40.0),
+    "describe": (10.0, 10.0),
+    "put": (3.0, 10.0),
+    "tags": (10.0, 10.0),
+}
+THROTTLE_CODES = frozenset(
+    {"ThrottlingException", "Throttling", "TooManyUpdates", "RequestLimitExceeded", "ThrottledException"}
+)
+
+
+class LimiterStats(NamedTuple):
+    calls: int
+    delayed: int  # calls that waited for a token instead of risking a throttle
+    wait_time: float
+    throttles: int
+    rate: float
+
+
+class TokenBucket:
+    """Token bucket whose rate halves on every throttle and creeps back up on success.
+
+    A throttle also starts a jittered cool-down, growing exponentially with consecutive throttles,
+    during which no tokens are handed out.
+    """
+
+    def __init__(self, rate: float, burst: float, min_rate: float = 0.5, max_backoff: float = 20.0):
+        self.max_rate = rate
+        self.rate = rate
+        self.burst = burst
+        self.min_rate = min(min_rate, rate)
+        self.max_backoff = max_backoff
+        self._tokens = burst
+        self._last = time.monotonic()
+        self._cooldown_until = 0.0
+        self._throttle_streak = 0
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.delayed = 0
+        self.wait_time = 0.0
+        self.throttles = 0
+
+    def _refill(self, now: float):
+        self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+
+    def acquire(self) -> float:
+        """Take a token, sleeping until one is available; returns the seconds spent waiting"""
+        waited = 0.0
+        with self._lock:
+            self.calls += 1
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                wait = max(self._cooldown_until - now, 0.0)
+                if not wait:
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        if waited:
+                            self.delayed += 1
+                            self.wait_time += waited
+                        return waited
+                    wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+            waited += wait
+
+    def on_throttle(self):
+        with self._lock:
+            self.throttles += 1
+            self._throttle_streak += 1
+            self.rate = max(self.min_rate, self.rate / 2)
+            backoff = min(self.max_backoff, 0.1 * 2**self._throttle_streak)
+            jitter = random.uniform(0, backoff)  # nosec B311
+            self._cooldown_until = max(self._cooldown_until, time.monotonic() + jitter)
+            self._tokens = min(self._tokens, 0.0)
+
+    def on_success(self):
+        with self._lock:
+            self._throttle_streak = 0
+            if self.rate < self.max_rate:
+                self.rate = min(self.max_rate, self.rate + self.max_rate / 20)
+
+    def stats(self) -> LimiterStats:
+        with self._lock:
+            return LimiterStats(self.calls, self.delayed, self.wait_time, self.throttles, self.rate)
+
+
+class RateLimiter:
+    """Client side limits for SSM calls, shared by every client it's attached to"""
+
+    def __init__(self, rates: Optional[dict[str, tuple[float, float]]] = None, enabled: bool = True):
+        self.enabled = enabled
+        self._buckets = {family: TokenBucket(*r) for family, r in {**DEFAULT_RATES, **(rates or {})}.items()}
+
+    def configure(self, family: str, rate: Optional[float] = None, burst: Optional[float] = None):
+        old = self._buckets[family]
+        self._buckets[family] = TokenBucket(rate or old.max_rate, burst or old.burst)
+
+    def bucket(self, operation: str) -> Optional[TokenBucket]:
+        family = OPERATION_FAMILIES.get(operation)
+        return None if family is None else self._buckets[family]
+
+    def stats(self) -> dict[str, LimiterStats]:
+        return {family: b.stats() for family, b in self._buckets.items()}
+
+    def attach(self, client: BaseClient):
+        events = client.meta.events
+        # unique ids are shared across all events of a client, so each handler needs its own
+        events.register("before-call.ssm", self._before_call, unique_id="ssm-parameter-config-limit")
+        events.register("needs-retry.ssm", self._needs_retry, unique_id="ssm-parameter-config-limit-retry")
+        events.register("after-call.ssm", self._after_call, unique_id="ssm-parameter-config-limit-after")
+
+    def _before_call(self, model, **_kwargs):
+        if not self.enabled:
+            return
+        bucket = self.bucket(model.name)
+        if bucket is not None:
+            waited = bucket.acquire()
+            if waited:
+                logger.debug("Waited %.3fs for a %s token", waited, model.name)
+
+    def _needs_retry(self, response: Any = None, operation: Any = None, **_kwargs):
+        if not self.enabled or response is None or operation is None:
+            return None
+        code = response[1].get("Error", {}).get("Code")
+        if code in THROTTLE_CODES:
+            bucket = self.bucket(operation.name)
+            if bucket is not None:
+                logger.info("%s throttled, slowing down to %.2f/s", operation.name, bucket.rate / 2)
+                bucket.on_throttle()
+        # botocore's own retry handler decides whether and when to retry
+        return None
+
+    def _after_call(self, model, parsed=None, **_kwargs):
+        if not self.enabled or (parsed or {}).get("Error"):
+            return
+        bucket = self.bucket(model.name)
+        if bucket is not None:
+            bucket.on_success()
+
+
+rate_limiter = RateLimiter()
@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from typing import TYPE_CHECKING, Callable, Optional
+
+from .clients import client_errors, get_ssm_client
+from .ssm_parameter import DESCRIBE_FILTER_BATCH_SIZE, SSMParameter, _batched
+
+if TYPE_CHECKING:
+    from .ssm_config import SSMConfig
+
+logger = logging.getLogger()
+
+ChangeCallback = Callable[["SSMConfig", "SSMConfig"], None]
+
+
+class WatchedConfig:
+    """Handle on a config kept up to date by a :class:`ConfigRefresher`.
+
+    Always read the current value through :attr:`config`; it is swapped for a freshly parsed
+    config whenever the parameter version changes, after which the callbacks get ``(old, new)``.
+    """
+
+    def __init__(self, config: SSMConfig, interval: float, refresher: ConfigRefresher):
+        if config.ssm_parameter is None:
+            raise ValueError("Only configs loaded from an SSM parameter can be watched")
+        self._config = config
+        self.name: str = config.ssm_parameter.name
+        self.version: Optional[int] = config.ssm_parameter.version
+        self.interval = interval
+        self.next_poll = time.monotonic() + interval
+        self._callbacks: list[ChangeCallback] = []
+        self._refresher = refresher
+        self._lock = threading.Lock()
+
+    @property
+    def config(self) -> SSMConfig:
+        return self._config
+
+    def add_callback(self, callback: ChangeCallback):
+        with self._lock:
+            self._callbacks.append(callback)
+
+    def remove_callback(self, callback: ChangeCallback):
+        with self._lock:
+            self._callbacks.remove(callback)
+
+    def stop(self):
+        self._refresher.unwatch(self)
+
+    def _swap(self, new: SSMConfig):
+        with self._lock:
+            old, self._config = self._config, new
+            self.version = new.ssm_parameter.version if new.ssm_parameter is not None else None
+            callbacks = list(self._callbacks)
+        for callback in callbacks:
+            try:
+                callback(old, new)
+            except Exception:  # pylint:disable=broad-except
+                logger.exception("Config change callback %r failed for %s", callback, self.name)
+
+    def __repr__(self) -> str:
+        return f"WatchedConfig(name={self.name!r}, version={self.version!r}, interval={self.interval!r})"
+
+
+class ConfigRefresher:
+    """Polls the versions of every watched config from a single background thread.
+
+    Each poll is one ``DescribeParameters`` call per 50 due names; values are only fetched and
+    re-parsed for the parameters whose version actually changed.
+    """
+
+    def __init__(self):
+        self._watched: list[WatchedConfig] = []
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+
+    def watch(self, config: SSMConfig, interval: float = 60.0, callback: Optional[ChangeCallback] = None):
+        watched = WatchedConfig(config, interval, self)
+        if callback is not None:
+            watched.add_callback(callback)
+        with self._cond:
+            self._watched.append(watched)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="ssm-config-refresher", daemon=True)
+                self._thread.start()
+            self._cond.notify_all()
+        return watched
+
+    def unwatch(self, watched: WatchedConfig):
+        with self._cond:
+            if watched in self._watched:
+                self._watched.remove(watched)
+            self._cond.notify_all()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if not self._watched:
+                    self._thread = None
+                    return
+                now = time.monotonic()
+                wait = min(w.next_poll for w in self._watched) - now
+                if wait > 0:
+                    self._cond.wait(wait)
+                    continue
+                due = [w for w in self._watched if w.next_poll <= now]
+            try:
+                self.poll(due)
+            except client_errors() as exc:
+                logger.warning("Polling config versions failed: %s", exc)
+            except Exception:  # pylint:disable=broad-except
+                # an unexpected error mustn't stop the thread every watched config relies on
+                logger.exception("Polling config versions failed")
+            finally:
+                now = time.monotonic()
+                for w in due:
+                    w.next_poll = now + w.interval
+
+    def poll(self, watched: Optional[list[WatchedConfig]] = None) -> list[WatchedConfig]:
+        """Check the given (default: all) watched configs now, returning the ones that changed"""
+        if watched is None:
+            with self._cond:
+                watched = list(self._watched)
+        by_name: dict[str, list[WatchedConfig]] = {}
+        for w in watched:
+            by_name.setdefault(w.name, []).append(w)
+
+        versions = _current_versions(list(by_name))
+        changed_names = [n for n, ws in by_name.items() if n in versions and any(w.version != versions[n] for w in ws)]
+        if not changed_names:
+            return []
+        # refreshes the parameter cache, so rebuilding the configs below costs no extra calls
+        SSMParameter.get_parameters(*changed_names, use_cache=False)
+        changed: list[WatchedConfig] = []
+        for name in changed_names:
+            changed.extend(w for w in by_name[name] if _reload(w, versions[name]))
+        return changed
+
+
+def _current_versions(names: list[str]) -> dict[str, int]:
+    """Stored version of each of ``names`` that exists, from one describe call per 50 names"""
+    pager = get_ssm_client().get_paginator("describe_parameters")
+    versions: dict[str, int] = {}
+    for batch in _batched(names, DESCRIBE_FILTER_BATCH_SIZE):
+        for page in pager.paginate(ParameterFilters=[{"Key": "Name", "Option": "Equals", "Values": batch}]):
+            versions.update((p["Name"], p["Version"]) for p in page["Parameters"])
+    return versions
+
+
+def _reload(watched: WatchedConfig, version: int) -> bool:
+    """Rebuild ``watched`` if it's behind ``version``; returns whether its config was swapped"""
+    if watched.version == version:
+        return False
+    logger.info("Reloading %s (version %s -> %s)", watched.name, watched.version, version)
+    try:
+        new = type(watched.config)(_aws_ssm_path=watched.name)
+    except ValueError:
+        # keep serving the old config, and don't retry until the parameter changes again
+        logger.exception("Could not parse version %s of %s", version, watched.name)
+        watched.version = version
+        return False
+    except Exception:  # pylint:disable=broad-except
+        # e.g. a failed call; the version is left alone, so the next poll tries again
+        logger.exception("Could not reload version %s of %s", version, watched.name)
+        return False
+    watched._swap(new)  # pylint:disable=protected-access
+    return True
+
+
+default_refresher = ConfigRefresher()
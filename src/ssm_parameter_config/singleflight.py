@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+
+import threading
+from typing import Any, Callable, Hashable, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class _Call:
+    __slots__ = ("done", "result", "error", "waiters")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Collapses concurrent calls for the same key into one.
+
+    The first caller for a key runs the function; anyone asking for the same key while it is
+    running waits for it and gets the same result (or exception) instead of repeating the work.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: dict[Hashable, _Call] = {}
+        self.shared = 0
+
+    def do(self, key: Hashable, func: Callable[..., T], *args: Any, **kwargs: Any) -> tuple[T, bool]:
+        """Run ``func`` (or join the call already running) for ``key``.
+
+        Returns the result and whether other callers got it too. In that case every one of them,
+        the caller that ran ``func`` included, holds the very same object, so copy it before
+        changing it.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = self._calls[key] = _Call()
+                leader = True
+            else:
+                call.waiters += 1
+                self.shared += 1
+                leader = False
+        if leader:
+            return self._lead(key, call, func, *args, **kwargs)
+        call.done.wait()
+        if call.error is not None:
+            raise call.error
+        return call.result, True
+
+    def _lead(self, key: Hashable, call: _Call, func: Callable[..., T], *args: Any, **kwargs: Any) -> tuple[T, bool]:
+        try:
+            call.result = func(*args, **kwargs)
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+                # nobody can join once the key is gone, so this is the final count
+                shared = call.waiters > 0
+            call.done.set()
+        return call.result, shared
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+
+inflight = SingleFlight()
@@ -0,0 +1,254 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, NamedTuple, Optional, Union
+
+from pydantic import parse_obj_as
+from pydantic.json import pydantic_encoder
+
+from .clients import client_errors
+from .ssm_parameter import SSMParameter, SSMPath
+
+logger = logging.getLogger()
+
+SNAPSHOT_FORMAT_VERSION = 1
+_TREE_PREFIX = "tree:"
+
+
+class SnapshotEntry(NamedTuple):
+    version: Optional[int]
+    timestamp: float
+    data: Any
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.timestamp
+
+
+def _param_to_dict(param: SSMParameter) -> dict[str, Any]:
+    # reads __dict__ directly so that lazily loaded fields aren't fetched just to be saved
+    exclude = set() if param._got_tags else {"tags"}  # pylint:disable=protected-access
+    out = param.dict(by_alias=True, exclude_none=True, exclude_defaults=True, exclude=exclude)
+    if not param._got_metadata:  # pylint:disable=protected-access
+        out["_lazy"] = True
+    return out
+
+
+def _param_from_dict(data: dict[str, Any], cls=SSMParameter) -> SSMParameter:
+    data = dict(data)
+    lazy = data.pop("_lazy", False)
+    param = parse_obj_as(cls, data)
+    param._got_metadata = not lazy  # pylint:disable=protected-access
+    param._got_tags = "Tags" in data  # pylint:disable=protected-access
+    return param
+
+
+class SnapshotStore:
+    """Compact on-disk store of fetched parameters and trees, for cold starts and offline fallback.
+
+    Everything is kept in one JSON file, each entry holding the parameter version and the time it
+    was saved. Entries older than ``max_stale`` seconds are never served (``None`` means no limit).
+    With ``serve_first`` the settings source returns a snapshot hit straight away and refreshes it
+    from SSM in the background; otherwise SSM is tried first and the snapshot is only used if that fails.
+    """
+
+    def __init__(self, path: Union[str, os.PathLike], max_stale: Optional[float] = None, serve_first: bool = False):
+        self.path = Path(path).expanduser()
+        self.max_stale = max_stale
+        self.serve_first = serve_first
+        self._lock = threading.RLock()
+        self._entries: Optional[dict[str, list]] = None
+        self._mtime: Optional[float] = None
+
+    def _load(self) -> dict[str, list]:
+        try:
+            mtime = self.path.stat().st_mtime
+        except FileNotFoundError:
+            if self._entries is None:
+                self._entries = {}
+            return self._entries
+        if self._entries is not None and mtime == self._mtime:
+            return self._entries
+        entries: dict[str, list]
+        try:
+            raw = json.loads(self.path.read_text(encoding="utf8"))
+            if raw.get("format") != SNAPSHOT_FORMAT_VERSION:
+                raise ValueError(f"Unsupported snapshot format {raw.get('format')!r}")
+            entries = raw["entries"]
+        except (ValueError, KeyError, AttributeError) as exc:
+            logger.warning("Ignoring unreadable snapshot %s: %s", self.path, exc)
+            entries = {}
+        self._entries, self._mtime = entries, mtime
+        return entries
+
+    def _write(self, update: Callable[[dict[str, list]], None]):
+        with self._lock:
+            entries = self._load()
+            update(entries)
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=self.path.parent, prefix=f".{self.path.name}.")
+            try:
+                with os.fdopen(fd, "wt", encoding="utf8") as fh:
+                    json.dump(
+                        {"format": SNAPSHOT_FORMAT_VERSION, "entries": entries},
+                        fh,
+                        separators=(",", ":"),
+                        default=pydantic_encoder,
+                    )
+                os.replace(tmp, self.path)
+            except BaseException:
+                os.unlink(tmp)
+                raise
+            self._mtime = self.path.stat().st_mtime
+
+    def get(self, key: str, max_stale: Optional[float] = None) -> Optional[SnapshotEntry]:
+        """Raw entry for ``key``, or ``None`` if missing or older than ``max_stale`` (default: the store's)"""
+        if max_stale is None:
+            max_stale = self.max_stale
+        with self._lock:
+            raw = self._load().get(key)
+        if raw is None:
+            return None
+        entry = SnapshotEntry(*raw)
+        if max_stale is not None and entry.age > max_stale:
+            return None
+        return entry
+
+    def put(self, key: str, version: Optional[int], data: Any):
+        self._write(lambda entries: entries.__setitem__(key, [version, time.time(), data]))
+
+    def delete(self, key: str):
+        def drop(entries: dict[str, list]):
+            entries.pop(key, None)
+
+        self._write(drop)
+
+    def save_parameter(self, param: SSMParameter):
+        self.put(param.name, param.version, _param_to_dict(param))
+
+    def load_parameter(self, name: str, cls=SSMParameter, max_stale: Optional[float] = None):
+        entry = self.get(name, max_stale)
+        if entry is None:
+            return None
+        return _param_from_dict(entry.data, cls)
+
+    def save_tree(self, path: SSMPath):
+        params = list(path.loaded_parameters())
+        version = max((p.version or 0 for p in params), default=None)
+        self.put(_TREE_PREFIX + path.name, version, [_param_to_dict(p) for p in params])
+
+    def load_tree(self, name: str, max_stale: Optional[float] = None) -> Optional[SSMPath]:
+        entry = self.get(_TREE_PREFIX + name, max_stale)
+        if entry is None:
+            return None
+        root = SSMPath(name=name)
+        root._listed = True  # pylint:disable=protected-access
+        root._insert_parameters(map(_param_from_dict, entry.data))  # pylint:disable=protected-access
+        return root
+
+
+_store_lock = threading.Lock()
+_default_store: Optional[SnapshotStore] = None
+_revalidating: set[str] = set()
+
+
+def set_snapshot_store(store: Optional[SnapshotStore]):
+    """Set the store used by :class:`~ssm_parameter_config.ssm_config.AwsSSMSettings` (``None`` disables it)"""
+    global _default_store  # pylint:disable=global-statement
+    with _store_lock:
+        _default_store = store
+
+
+def get_snapshot_store() -> Optional[SnapshotStore]:
+    """The configured store, falling back to ``SSM_PARAMETER_CONFIG_SNAPSHOT`` (and
+    ``SSM_PARAMETER_CONFIG_SNAPSHOT_MAX_STALE``) from the environment"""
+    global _default_store  # pylint:disable=global-statement
+    with _store_lock:
+        if _default_store is None and "SSM_PARAMETER_CONFIG_SNAPSHOT" in os.environ:
+            max_stale = os.environ.get("SSM_PARAMETER_CONFIG_SNAPSHOT_MAX_STALE")
+            _default_store = SnapshotStore(
+                os.environ["SSM_PARAMETER_CONFIG_SNAPSHOT"],
+                max_stale=float(max_stale) if max_stale else None,
+                serve_first=os.environ.get("SSM_PARAMETER_CONFIG_SNAPSHOT_SERVE_FIRST", "").lower() in ("1", "true"),
+            )
+        return _default_store
+
+
+def _refresh_parameter(store: SnapshotStore, name: str, cls) -> SSMParameter:
+    param = cls.get_parameter(name, use_cache=False)
+    if param.version is None:
+        store.delete(name)
+    else:
+        store.save_parameter(param)
+    return param
+
+
+def _revalidate(store: SnapshotStore, name: str, cls):
+    try:
+        _refresh_parameter(store, name, cls)
+    except client_errors() as exc:
+        logger.warning("Background refresh of %s failed: %s", name, exc)
+    finally:
+        with _store_lock:
+            _revalidating.discard(name)
+
+
+def fetch_parameter(name: str, store: Optional[SnapshotStore] = None, cls=SSMParameter) -> SSMParameter:
+    """:meth:`SSMParameter.get_parameter` backed by a snapshot store.
+
+    Successful fetches are written to the store. If SSM can't be reached (or throttles), an
+    entry no older than the store's ``max_stale`` is returned instead of raising.
+    """
+    if store is None:
+        store = get_snapshot_store()
+    if store is None:
+        return cls.get_parameter(name)
+    # in-memory hits were already saved when they were fetched
+    in_memory = cls._cached(name)  # pylint:disable=protected-access
+    if in_memory is not None:
+        return in_memory
+    if store.serve_first:
+        cached = store.load_parameter(name, cls)
+        if cached is not None:
+            with _store_lock:
+                start = name not in _revalidating
+                _revalidating.add(name)
+            if start:
+                threading.Thread(target=_revalidate, args=(store, name, cls), daemon=True).start()
+            return cached
+    try:
+        return _refresh_parameter(store, name, cls)
+    except client_errors() as exc:
+        cached = store.load_parameter(name, cls)
+        if cached is None:
+            raise
+        logger.warning("Serving %s from snapshot %s: %s", name, store.path, exc)
+        return cached
+
+
+def fetch_tree(name: str, store: Optional[SnapshotStore] = None, values_only: bool = False) -> SSMPath:
+    """Load the whole tree below ``name``, saving it to (or falling back to) a snapshot store"""
+    if store is None:
+        store = get_snapshot_store()
+    root = SSMPath(name=name)
+    root.set_values_only(values_only)
+    if store is None:
+        root.fetch_parameters()
+        return root
+    try:
+        root.fetch_parameters()
+    except client_errors() as exc:
+        cached = store.load_tree(name)
+        if cached is None:
+            raise
+        logger.warning("Serving tree %s from snapshot %s: %s", name, store.path, exc)
+        return cached
+    store.save_tree(root)
+    return root
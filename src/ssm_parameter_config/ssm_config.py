@@ -1,30 +1,42 @@
 # -*- coding: utf-8 -*-
 from __future__ import annotations
 
+import functools
 import io
+import logging
 import os
 import shlex
 from pathlib import Path, PurePath
-from typing import Any, Dict, Iterable, Mapping, Optional, Type, Union
+from typing import Any, Dict, Iterable, Mapping, NamedTuple, Optional, Type, Union
 
-from pydantic import BaseSettings, ValidationError, parse_obj_as
+from pydantic import BaseModel, BaseSettings, Extra, ValidationError, parse_obj_as
 from pydantic.env_settings import DotenvType, SettingsSourceCallable, env_file_sentinel
 
-from ._yaml import encode_for_yaml, yaml
-from .ssm_parameter import SSMParameter
-from .utils import lazy_dict
+from ._yaml import encode_for_yaml, get_yaml
+from .aio import run_sync
+from .instrument import instrumentation
+from .refresh import ChangeCallback, ConfigRefresher, WatchedConfig, default_refresher
+from .snapshot import fetch_parameter
+from .ssm_parameter import SSMParameter, WritePlan, WriteResult
+from .utils import format_header, lazy_dict
 
 StrPath = Union[str, os.PathLike, PurePath]
 
+logger = logging.getLogger()
+
 
 class LocalSSMSettings:
-    __slots__ = ("local_ssm_path",)
+    __slots__ = ("local_ssm_path", "local_ssm_data")
 
-    def __init__(self, local_ssm_path: Optional[StrPath]):
+    def __init__(self, local_ssm_path: Optional[StrPath], local_ssm_data: Optional[Mapping[str, Any]] = None):
         self.local_ssm_path: Optional[StrPath] = local_ssm_path
+        # an already parsed settings file, used instead of reading one
+        self.local_ssm_data: Optional[Mapping[str, Any]] = local_ssm_data
 
     def __call__(self, settings: BaseSettings) -> Dict[str, Any]:
         settings_path: StrPath
+        if self.local_ssm_data is not None:
+            return self._apply_case(settings, self.local_ssm_data)
         if self.local_ssm_path is not None:
             settings_path = self.local_ssm_path
         elif "LOCAL_SSM_SETTINGS_PATH" in os.environ:
@@ -38,10 +50,13 @@ class LocalSSMSettings:
         if not spath.exists():
             return {}
 
-        pdict = lazy_dict(spath.read_text(encoding="utf8"))
+        pdict = lazy_dict(spath.read_text(encoding="utf8"), round_trip=False)
+        return self._apply_case(settings, pdict)
 
+    @staticmethod
+    def _apply_case(settings: BaseSettings, pdict: Mapping[str, Any]) -> Dict[str, Any]:
         if settings.__config__.case_sensitive:
-            return pdict
+            return dict(pdict)
 
         return {k.lower(): v for k, v in pdict.items()}
 
@@ -66,11 +81,14 @@ class AwsSSMSettings:
         else:
             return {}
 
-        param = SSMParameter.get_parameter(settings_path)
-        if param.value == "":
+        start = instrumentation.start()
+        param = fetch_parameter(settings_path)
+        if not param.value:
+            instrumentation.record("source", "aws_ssm", start, settings_path)
             return {}
-        pdict = param.lazy_dict()
+        pdict = param.lazy_dict(round_trip=False)
         pdict["ssm_parameter"] = param
+        instrumentation.record("source", "aws_ssm", start, settings_path, bytes_received=len(param.value))
         if settings.__config__.case_sensitive:
             return pdict
 
@@ -83,6 +101,65 @@ class AwsSSMSettings:
 _ssm_config_classes: list[Type[SSMConfig]] = []
 
 
+class DispatchInfo(NamedTuple):
+    config_class: Type[SSMConfig]
+    attempts: int
+    candidates: int
+
+
+class _DispatchIndex:
+    """Narrows down which registered classes an object could validate as, before validating.
+
+    Classes whose ``Config.ssm_config_discriminator`` field holds the object's value for that field
+    are the only candidates. Otherwise every class is a candidate, most recently registered first,
+    except those forbidding extra fields that don't know every key. Classes missing required fields
+    stay, since the environment may fill them in.
+    """
+
+    def __init__(self, classes: list[Type[SSMConfig]]):
+        self.size = len(classes)
+        self.ordered = list(reversed(classes))
+        self.discriminated: dict[tuple[str, Any], list[Type[SSMConfig]]] = {}
+        # keys each class accepts, for those that forbid extra fields
+        self.known_keys: dict[Type[SSMConfig], frozenset[str]] = {}
+        for c in self.ordered:
+            field_name = getattr(c.__config__, "ssm_config_discriminator", None)
+            if field_name is not None and field_name in c.__fields__:
+                field = c.__fields__[field_name]
+                self.discriminated.setdefault((field.alias, field.default), []).append(c)
+            if c.__config__.extra == Extra.forbid:
+                known = frozenset(f.alias for f in c.__fields__.values())
+                if c.__config__.allow_population_by_field_name:
+                    known |= frozenset(c.__fields__)
+                self.known_keys[c] = known
+        self.discriminator_keys = {k for k, _ in self.discriminated}
+
+    def candidates(self, obj: Any) -> list[Type[SSMConfig]]:
+        if not isinstance(obj, Mapping):
+            return self.ordered
+        for key in self.discriminator_keys:
+            if key in obj:
+                try:
+                    found = self.discriminated.get((key, obj[key]))
+                except TypeError:  # unhashable value
+                    found = None
+                if found:
+                    return found
+        keys = set(obj)
+        return [c for c in self.ordered if c not in self.known_keys or keys <= self.known_keys[c]]
+
+
+_dispatch_index: Optional[_DispatchIndex] = None
+
+
+def _get_dispatch_index() -> _DispatchIndex:
+    global _dispatch_index  # pylint:disable=global-statement
+    # classes are only ever added, so the size says whether the index is current
+    if _dispatch_index is None or _dispatch_index.size != len(_ssm_config_classes):
+        _dispatch_index = _DispatchIndex(_ssm_config_classes)
+    return _dispatch_index
+
+
 class SSMConfig(BaseSettings):
     def __init__(  # pylint: disable=no-self-argument
         __pydantic_self__,
@@ -92,15 +169,38 @@ class SSMConfig(BaseSettings):
         _env_nested_delimiter: Optional[str] = None,
         _secrets_dir: Optional[StrPath] = None,
         _local_ssm_path: Optional[StrPath] = None,
+        _local_ssm_data: Optional[Mapping[str, Any]] = None,
         _aws_ssm_path: Optional[str] = None,
         **values: Any,
     ) -> None:
         if _local_ssm_path is not None:
             values["_local_ssm_path"] = _local_ssm_path
 
+        if _local_ssm_data is not None:
+            values["_local_ssm_data"] = _local_ssm_data
+
         if _aws_ssm_path is not None:
             values["_aws_ssm_path"] = _aws_ssm_path
-        super().__init__(_env_file, _env_file_encoding, _env_nested_delimiter, _secrets_dir, **values)
+        # BaseSettings.__init__, split up so that validation can be timed apart from the sources
+        values = __pydantic_self__._build_values(
+            values,
+            _env_file=_env_file,
+            _env_file_encoding=_env_file_encoding,
+            _env_nested_delimiter=_env_nested_delimiter,
+            _secrets_dir=_secrets_dir,
+        )
+        start = instrumentation.start()
+        if start is None:
+            BaseModel.__init__(__pydantic_self__, **values)
+            return
+        param = values.get("ssm_parameter")
+        name = param.name if isinstance(param, SSMParameter) else None
+        try:
+            BaseModel.__init__(__pydantic_self__, **values)
+        except ValidationError:
+            instrumentation.record("validate", type(__pydantic_self__).__name__, start, name, error="ValidationError")
+            raise
+        instrumentation.record("validate", type(__pydantic_self__).__name__, start, name)
 
     ssm_parameter: Optional[SSMParameter] = None
 
@@ -119,7 +219,8 @@ class SSMConfig(BaseSettings):
             # this is an ugly way to store these special variables without overriding
             # the whole BaseSettings._build_values function
             local_source = LocalSSMSettings(
-                local_ssm_path=init_settings.init_kwargs.pop("_local_ssm_path", None)  # type: ignore[attr-defined]
+                local_ssm_path=init_settings.init_kwargs.pop("_local_ssm_path", None),  # type: ignore[attr-defined]
+                local_ssm_data=init_settings.init_kwargs.pop("_local_ssm_data", None),  # type: ignore[attr-defined]
             )
             aws_source = AwsSSMSettings(
                 ssm_path=init_settings.init_kwargs.pop("_aws_ssm_path", None)  # type: ignore[attr-defined]
@@ -132,7 +233,7 @@ class SSMConfig(BaseSettings):
                 file_secret_settings,
             )
 
-    def export(self, exp_format="yaml", exclude_ssm=True, ssm_format=False, **dump_kwargs):
+    def export(self, exp_format="yaml", exclude_ssm=True, ssm_format=False, with_format_header=False, **dump_kwargs):
         dict_args = {"exclude_none": True, "by_alias": True, "exclude_defaults": True}
         if exclude_ssm:
             dict_args["exclude"] = {"ssm_parameter"}
@@ -144,7 +245,7 @@ class SSMConfig(BaseSettings):
             kwargs = {}
             kwargs.update(dump_kwargs)
             out = io.StringIO()
-            yaml.dump(encode_for_yaml(self.dict(**dict_args)), out, **kwargs)
+            get_yaml().dump(encode_for_yaml(self.dict(**dict_args)), out, **kwargs)
             output = out.getvalue()
         elif exp_format == "env":
             exp = []
@@ -157,41 +258,96 @@ class SSMConfig(BaseSettings):
             output = "\n".join(exp)
         else:
             raise ValueError(f"Format {exp_format} not supported.")
+        if with_format_header:
+            output = format_header(exp_format) + output
         if ssm_format:
             return SSMParameter.get_parameter_value(output)
         return output
 
     @classmethod
     def from_object(cls, obj: dict[str, Any]):
-        for c in reversed(_ssm_config_classes):
+        return cls.dispatch(obj)[0]
+
+    @classmethod
+    def dispatch(cls, obj: dict[str, Any]) -> tuple[SSMConfig, DispatchInfo]:
+        """Parse ``obj`` as the registered class it fits, also reporting which class that was
+        and how many validations it took"""
+        candidates = _get_dispatch_index().candidates(obj)
+        attempts = 0
+        for c in candidates:
+            attempts += 1
             try:
                 new_cls = parse_obj_as(c, obj)
                 break
             except ValidationError:
                 pass
         else:
-            raise ValueError(f"Could not parse {obj} as any of {_ssm_config_classes!r}")
-        return new_cls
+            raise ValueError(f"Could not parse {obj} as any of {candidates!r}")
+        info = DispatchInfo(c, attempts, len(candidates))
+        logger.debug("Parsed config as %s after %d of %d candidates", c.__name__, attempts, len(candidates))
+        return new_cls, info
 
     @classmethod
     def from_file(cls, file: StrPath) -> SSMConfig:
-        for c in reversed(_ssm_config_classes):
+        """Load a settings file as whichever registered class it fits.
+
+        The file is read and parsed once, and the candidate classes (ordered as in :meth:`dispatch`)
+        are then tried against the parsed data.
+        """
+        spath = Path(file).expanduser()
+        pdict = lazy_dict(spath.read_text(encoding="utf8"), round_trip=False) if spath.exists() else {}
+        candidates = _get_dispatch_index().candidates(pdict)
+        for c in candidates:
             try:
-                new_cls = c(_local_ssm_path=file)
+                new_cls = c(_local_ssm_data=pdict)
                 break
             except ValidationError:
                 pass
         else:
-            raise ValueError(f"Could not parse {file!s} as any of {_ssm_config_classes!r}")
+            raise ValueError(f"Could not parse {file!s} as any of {candidates!r}")
         return new_cls
 
     @classmethod
     def from_parameter(cls, parameter: SSMParameter) -> SSMConfig:
-        ld = parameter.lazy_dict()
+        ld = parameter.lazy_dict(round_trip=False)
         new_cls = cls.from_object(ld)
         new_cls.ssm_parameter = parameter
         return new_cls
 
+    @classmethod
+    def from_parameters(cls, *names: str) -> dict[str, SSMConfig]:
+        """Build configs for many parameter names from one batched fetch.
+
+        Names that don't exist (or are empty) in SSM are left out of the result.
+        """
+        params = SSMParameter.get_parameters(*names)
+        return {name: cls.from_parameter(param) for name, param in params.items() if param.value}
+
+    @classmethod
+    async def aload(cls, **kwargs: Any) -> SSMConfig:
+        """Async constructor; builds ``cls(**kwargs)`` off the event loop since sources may hit SSM"""
+        return await run_sync(functools.partial(cls, **kwargs))
+
+    @classmethod
+    async def afrom_parameters(cls, *names: str) -> dict[str, SSMConfig]:
+        """Async :meth:`from_parameters`"""
+        params = await SSMParameter.aget_parameters(*names)
+        return {name: cls.from_parameter(param) for name, param in params.items() if param.value}
+
+    def watch(
+        self,
+        interval: float = 60.0,
+        callback: Optional[ChangeCallback] = None,
+        refresher: Optional[ConfigRefresher] = None,
+    ) -> WatchedConfig:
+        """Keep this config up to date in the background.
+
+        The parameter version is polled every ``interval`` seconds, and when it changes the config is
+        rebuilt with ``type(self)(_aws_ssm_path=...)`` and swapped into the returned handle's
+        :attr:`~WatchedConfig.config`, after which ``callback(old, new)`` is called.
+        """
+        return (refresher or default_refresher).watch(self, interval=interval, callback=callback)
+
     def _write_config_env(self):
         if isinstance(self.__config__.env_file, (list, tuple)):
             efile = self.__config__.env_file[0]
@@ -214,12 +370,68 @@ class SSMConfig(BaseSettings):
             self.ssm_parameter = ssm_param
         return ssm_param
 
-    def _write_config_ssm(self, exp_format, ssm_parameter_path=None, as_cli_input: bool = False):
+    def _write_config_ssm(
+        self,
+        exp_format,
+        ssm_parameter_path=None,
+        as_cli_input: bool = False,
+        skip_unchanged: bool = False,
+        expected_version: Optional[int] = None,
+    ):
         kwargs = {}
         if as_cli_input:
             kwargs = {"ignore_current": True}
         ssm_param = self.to_parameter(exp_format=exp_format, ssm_parameter_path=ssm_parameter_path, **kwargs)
-        return ssm_param.put_parameter(as_cli_input=as_cli_input)
+        return ssm_param.put_parameter(
+            as_cli_input=as_cli_input, skip_unchanged=skip_unchanged, expected_version=expected_version
+        )
+
+    @staticmethod
+    def _export_many(
+        configs: Iterable[Union[SSMConfig, tuple[SSMConfig, str]]], exp_format: str, attach: bool
+    ) -> list[SSMParameter]:
+        items = [c if isinstance(c, tuple) else (c, None) for c in configs]
+        paths = [path for _, path in items if path is not None]
+        current = SSMParameter.get_parameters(*paths) if paths else {}
+        params = []
+        for cfg, path in items:
+            ssm_param = current[path] if path is not None else cfg.ssm_parameter
+            if ssm_param is None:
+                raise ValueError(f"No SSM parameter (path) defined for {cfg!r}")
+            if not attach:
+                ssm_param = ssm_param.copy()
+            ssm_param.value = cfg.export(exp_format)
+            if attach:
+                cfg.ssm_parameter = ssm_param
+            params.append(ssm_param)
+        return params
+
+    @staticmethod
+    def write_many(
+        configs: Iterable[Union[SSMConfig, tuple[SSMConfig, str]]],
+        exp_format: str = "yaml",
+        max_workers: int = 8,
+        skip_unchanged: bool = False,
+        check_versions: bool = False,
+    ) -> list[WriteResult]:
+        """Export and write many configs to SSM concurrently.
+
+        Each item is either a config that already has an ``ssm_parameter``, or a ``(config, path)``
+        pair. The current parameters for all given paths are fetched in one batched call so their
+        settings (description, tier...) are kept. Results come back in input order.
+        See :meth:`SSMParameter.put_parameters` for ``skip_unchanged`` and ``check_versions``.
+        """
+        params = SSMConfig._export_many(configs, exp_format, attach=True)
+        return SSMParameter.put_parameters(
+            params, max_workers=max_workers, skip_unchanged=skip_unchanged, check_versions=check_versions
+        )
+
+    @staticmethod
+    def plan_many(
+        configs: Iterable[Union[SSMConfig, tuple[SSMConfig, str]]], exp_format: str = "yaml"
+    ) -> list[WritePlan]:
+        """What :meth:`write_many` would create, update or leave alone, without writing anything"""
+        return SSMParameter.plan_writes(SSMConfig._export_many(configs, exp_format, attach=False))
 
     def _write_config_local(self, exp_format, path):
         val = self.export(exp_format)
@@ -232,9 +444,17 @@ class SSMConfig(BaseSettings):
         ssm_parameter_path=None,
         local_path=None,
         as_cli_input: bool = False,
+        skip_unchanged: bool = False,
+        expected_version: Optional[int] = None,
     ):
         if ssm_parameter_path is not None or (self.ssm_parameter is not None and exp_format != "env"):
-            return self._write_config_ssm(exp_format, ssm_parameter_path=ssm_parameter_path, as_cli_input=as_cli_input)
+            return self._write_config_ssm(
+                exp_format,
+                ssm_parameter_path=ssm_parameter_path,
+                as_cli_input=as_cli_input,
+                skip_unchanged=skip_unchanged,
+                expected_version=expected_version,
+            )
         if hasattr(self.__config__, "local_settings_path") or local_path is not None:
             if local_path is not None:
                 output = Path(local_path)
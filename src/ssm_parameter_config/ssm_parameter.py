@@ -1,28 +1,83 @@
 # -*- coding: utf-8 -*-
 from __future__ import annotations
 
-import base64
+import functools
+import hashlib
+import itertools
 import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from enum import Enum
-from typing import TYPE_CHECKING, Any, Iterator, Optional
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncIterator,
+    Iterable,
+    Iterator,
+    NamedTuple,
+    Optional,
+)
 
-import boto3
-from botocore.client import BaseClient
 from pydantic import BaseModel, PrivateAttr, parse_obj_as
 from pydantic.utils import to_camel
-from signed_pickle import DumperSigner
 
-from .ssm_path import PureSSMPath
+from .aio import gather_sync, run_sync
+from .cache import parameter_cache
+from .clients import client_errors, get_ssm_client
+from .codec import (
+    CHUNK_SIZE,
+    Manifest,
+    chunk_name,
+    decode_value,
+    encode_value,
+    is_chunk_name,
+    join_chunks,
+    parse_manifest,
+    split_chunks,
+)
+from .instrument import InstrumentEvent, instrumentation
+from .singleflight import inflight
 from .utils import lazy_dict, ssm_curly_to_special, ssm_special_to_curly
 
 if TYPE_CHECKING:
+    from botocore.client import BaseClient
+
     from .ssm_config import SSMConfig
 
 # since SSM Parameters can't have {{ }} in them, we substitute these values
 
 logger = logging.getLogger()
 
+# API limits on the number of names in one GetParameters call / one DescribeParameters filter
+GET_PARAMETERS_BATCH_SIZE = 10
+DESCRIBE_FILTER_BATCH_SIZE = 50
+# value size limits; bigger values are split into chunks
+STANDARD_VALUE_LIMIT = 4096
+ADVANCED_VALUE_LIMIT = 8192
+
+
+def _batched(items: Iterable[str], size: int) -> Iterator[list[str]]:
+    it = iter(items)
+    while batch := list(itertools.islice(it, size)):
+        yield batch
+
+
+# tag naming the format (json, yaml or env) of a parameter's value
+FORMAT_TAG = "ssm-config-format"
+
+# fields that only come from describe_parameters, and so may be loaded lazily
+_METADATA_FIELDS = ("description", "key_id", "allowed_pattern", "tier")
+_LAZY_FIELDS = frozenset(_METADATA_FIELDS + ("tags",))
+# settings sent with a write; a change to any of them makes the write more than a no-op
+_VALUE_WRITE_FIELDS = ("type", "data_type")
+_WRITE_FIELDS = _VALUE_WRITE_FIELDS + _METADATA_FIELDS
+
+
+def content_hash(value: str) -> str:
+    return hashlib.sha256(value.encode("utf8")).hexdigest()
+
 
 class Tag(BaseModel):
     key: str
@@ -50,6 +105,141 @@ class SSMDataType(str, Enum):
     ssm_integration = "aws:ssm:integration"
 
 
+class WriteAction(str, Enum):
+    create = "create"
+    update = "update"
+    noop = "noop"
+
+
+class WritePlan(NamedTuple):
+    name: str
+    action: WriteAction
+    current_version: Optional[int]
+    current_hash: Optional[str]
+    new_hash: str
+
+
+class WriteResult(NamedTuple):
+    name: str
+    ok: bool
+    version: Optional[int]
+    error: Optional[Exception]
+    action: Optional[WriteAction] = None  # only known if the write was diffed against SSM
+
+
+class VersionConflictError(ValueError):
+    """The stored parameter isn't at the version the writer expected"""
+
+    def __init__(self, name: str, expected: Optional[int], current: Optional[int]):
+        super().__init__(f"{name} is at version {current}, expected {expected}")
+        self.name = name
+        self.expected = expected
+        self.current = current
+
+
+class TreeLoadTiming(NamedTuple):
+    """Seconds spent in each phase of a tree load.
+
+    ``describe`` and ``values`` are the wall times of the two paginators, which run concurrently,
+    so ``describe + values - total`` roughly shows the time saved over loading them back to back.
+    """
+
+    describe: float
+    values: float
+    build: float
+    total: float
+    parameters: int
+
+
+class ParameterRecord(NamedTuple):
+    """Plain record of one parameter, as yielded by :meth:`SSMPath.iter_parameters`; fields that
+    weren't asked for are ``None``"""
+
+    name: str
+    value: Optional[str] = None
+    type: Optional[str] = None
+    version: Optional[int] = None
+    last_modified_date: Optional[datetime] = None
+    data_type: Optional[str] = None
+    description: Optional[str] = None
+    key_id: Optional[str] = None
+    allowed_pattern: Optional[str] = None
+    tier: Optional[str] = None
+
+
+# fields GetParametersByPath returns; the rest only come from DescribeParameters
+_VALUE_FIELDS = frozenset(("name", "value", "type", "version", "last_modified_date", "data_type"))
+_RECORD_KEYS = {f: to_camel(f) for f in ParameterRecord._fields if f != "name"}
+
+
+def _record(p: dict[str, Any], fields: frozenset[str]) -> ParameterRecord:
+    record = ParameterRecord(p["Name"], **{f: p.get(k) for f, k in _RECORD_KEYS.items() if f in fields})
+    if record.value is not None:
+        record = record._replace(value=ssm_special_to_curly(record.value))
+    return record
+
+
+class TreeChanges(NamedTuple):
+    """What :meth:`SSMPath.refresh` changed: new and updated parameters are the nodes now in the
+    tree, deleted ones the nodes that were taken out of it"""
+
+    added: list[SSMParameter]
+    updated: list[SSMParameter]
+    deleted: list[SSMParameter]
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.updated or self.deleted)
+
+
+_loader_lock = threading.Lock()
+_loader_executor: Optional[ThreadPoolExecutor] = None
+
+
+def _get_loader_executor() -> ThreadPoolExecutor:
+    global _loader_executor  # pylint:disable=global-statement
+    with _loader_lock:
+        if _loader_executor is None:
+            _loader_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="ssm-tree-loader")
+        return _loader_executor
+
+
+def _load_parameters(
+    ssm: BaseClient, path: str, values_only: bool = False
+) -> tuple[list[dict[str, Any]], TreeLoadTiming]:
+    """List every parameter under ``path`` with its metadata.
+
+    The ``describe_parameters`` paginator runs on a worker thread while ``get_parameters_by_path``
+    runs here, and pages from both sides are merged by name as they arrive. With ``values_only``
+    the describe side is skipped entirely.
+    """
+    params: dict[str, dict[str, Any]] = {}
+    lock = threading.Lock()
+
+    def merge(page_params):
+        with lock:
+            for p in page_params:
+                params.setdefault(p["Name"], {}).update(p)
+
+    def describe() -> float:
+        start = time.perf_counter()
+        pager = ssm.get_paginator("describe_parameters")
+        for page in pager.paginate(ParameterFilters=[{"Key": "Name", "Option": "BeginsWith", "Values": [path]}]):
+            merge(page["Parameters"])
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    describe_future = None if values_only else _get_loader_executor().submit(describe)
+    names: list[str] = []
+    for page in ssm.get_paginator("get_parameters_by_path").paginate(Path=path, Recursive=True):
+        names.extend(p["Name"] for p in page["Parameters"] if not is_chunk_name(p["Name"]))
+        merge(page["Parameters"])
+    values = time.perf_counter() - start
+    describe_time = 0.0 if describe_future is None else describe_future.result()
+    total = time.perf_counter() - start
+    # BeginsWith can also match siblings that merely share a prefix, so only keep what was listed by path
+    return [params[n] for n in names], TreeLoadTiming(describe_time, values, 0.0, total, len(names))
+
+
 class SSMPath(BaseModel):
     """kind of like a pathlib path, but not quite"""
 
@@ -57,6 +247,8 @@ class SSMPath(BaseModel):
     _listed: bool = PrivateAttr(False)
     _children: dict[str, SSMPath] = PrivateAttr({})
     _aws_client_kwargs: dict[str, Any] = PrivateAttr(default={})
+    _load_timing: Optional[TreeLoadTiming] = PrivateAttr(default=None)
+    _values_only: bool = PrivateAttr(default=False)
 
     def __getitem__(self, item):
         if isinstance(item, tuple):
@@ -71,7 +263,7 @@ class SSMPath(BaseModel):
         self._fetch_children()
         if item in self._children:
             return self._children[item]
-        nc = SSMPath(name=str(self.path / item))
+        nc = self._new_child(item)
         self._children[item] = nc
         return nc
 
@@ -91,74 +283,263 @@ class SSMPath(BaseModel):
 
     @property
     def path(self):
+        from .ssm_path import PureSSMPath  # pylint:disable=import-outside-toplevel
+
         return PureSSMPath(self.name)
 
-    def fetch_parameters(self, path):
-        ssm = self.ssm_client
-        get_params_pager = ssm.get_paginator("get_parameters_by_path")
-        desc_params_pager = ssm.get_paginator("describe_parameters")
-        params = {}
-
-        # fetch descriptions
-        for page in desc_params_pager.paginate(
-            ParameterFilters=[{"Key": "Name", "Option": "BeginsWith", "Values": [path]}]
-        ):
-            for p in page["Parameters"]:
-                params[p["Name"]] = p
-        # fetch values
-        for page in get_params_pager.paginate(Path=path, Recursive=True):
-            for p in page["Parameters"]:
-                params[p["Name"]].update(p)
-
-        for p in params.values():
-            p["Value"] = ssm_special_to_curly(p["Value"])
-            param = parse_obj_as(SSMParameter, p)
-
-            rel_path = param.path.relative_to(self.path).parts
-            self[rel_path] = param
-            parts = []
-            for part in rel_path[:-1]:
-                parts.append(part)
-                self[tuple(parts)]._listed = True  # pylint:disable=protected-access
+    def fetch_parameters(self, path=None, values_only: Optional[bool] = None):
+        self._load_tree(self.name if path is None else path, values_only=values_only)
         self._listed = True
 
     def _fetch_children(self):
         if self._listed:
             return
+        # threads racing to list the same node wait for the first one instead of listing it again
+        inflight.do(("children", id(self)), self._list_children)
 
+    def _list_children(self):
+        if self._listed:
+            return
+        logger.info("Getting children for %s", self.name)
+        self._load_tree(self.name)
         self._listed = True
+
+    def _load_tree(self, path: str, values_only: Optional[bool] = None):
+        if values_only is None:
+            values_only = self._values_only
         ssm = self.ssm_client
-        logger.info("Getting children for %s", self.name)
-        get_params_pager = ssm.get_paginator("get_parameters_by_path")
-        desc_params_pager = ssm.get_paginator("describe_parameters")
-        params = {}
-
-        # fetch descriptions
-        for page in desc_params_pager.paginate(
-            ParameterFilters=[{"Key": "Name", "Option": "BeginsWith", "Values": [self.name]}]
-        ):
-            for p in page["Parameters"]:
-                params[p["Name"]] = p
-        # fetch values
-        for page in get_params_pager.paginate(Path=self.name, Recursive=True):
-            for p in page["Parameters"]:
-                params[p["Name"]].update(p)
-
-        for p in params.values():
-            p["Value"] = ssm_special_to_curly(p["Value"])
-            param = parse_obj_as(SSMParameter, p)
-            rel_path = param.path.relative_to(self.path).parts
-            self[rel_path] = param
-            parts = []
-            for part in rel_path[:-1]:
-                parts.append(part)
-                self[tuple(parts)]._listed = True  # pylint:disable=protected-access
+        # the listing may be shared with other nodes loading the same path, so it's treated as read only
+        (params, timing), _ = inflight.do(
+            ("tree", id(ssm), path, values_only), _load_parameters, ssm, path, values_only=values_only
+        )
+        build_start = time.perf_counter()
+        self._insert_parameters(self._parse_listed(p, got_metadata=not values_only) for p in params)
+        build = time.perf_counter() - build_start
+        self._load_timing = timing._replace(build=build, total=timing.total + build)
+        logger.debug("Loaded %s: %s", path, self._load_timing)
+        if instrumentation.enabled:
+            operation = "values" if values_only else "values+describe"
+            items = self._load_timing.parameters
+            instrumentation.emit(InstrumentEvent("tree_load", operation, path, self._load_timing.total, items=items))
+            instrumentation.emit(InstrumentEvent("validate", "SSMParameter", path, build, items=items))
+
+    def refresh(self) -> TreeChanges:
+        """Bring the loaded tree below this path up to date with SSM.
+
+        Versions and modification dates are listed with ``DescribeParameters`` (50 per call, no
+        values), and only parameters that were added or changed are fetched, with batched
+        ``GetParameters`` calls, and parsed. Nodes for unchanged parameters are kept as they are.
+        """
+        index = self._index_loaded()
+        ssm = self.ssm_client
+        listed: dict[str, dict[str, Any]] = {}
+        pager = ssm.get_paginator("describe_parameters")
+        for page in pager.paginate(ParameterFilters=[{"Key": "Path", "Option": "Recursive", "Values": [self.name]}]):
+            listed.update((p["Name"], p) for p in page["Parameters"] if not is_chunk_name(p["Name"]))
+
+        stale = [
+            name
+            for name, p in listed.items()
+            if name not in index
+            or (index[name][2].version, index[name][2].last_modified_date) != (p["Version"], p["LastModifiedDate"])
+        ]
+
+        def fetch(batch: list[str]) -> list[dict[str, Any]]:
+            return ssm.get_parameters(Names=batch)["Parameters"]
+
+        changes = TreeChanges([], [], [])
+        for page_params in _get_loader_executor().map(fetch, list(_batched(stale, GET_PARAMETERS_BATCH_SIZE))):
+            for p in page_params:
+                self._apply_fetched({**listed[p["Name"]], **p}, index, changes)
+        self._insert_parameters(changes.added)
+        for name in index.keys() - listed.keys():
+            self._drop_deleted(index[name], changes)
+        if changes.deleted:
+            self._prune()
+        self._listed = True
+        logger.debug(
+            "Refreshed %s: %d added, %d updated, %d deleted",
+            self.name,
+            len(changes.added),
+            len(changes.updated),
+            len(changes.deleted),
+        )
+        return changes
+
+    def _index_loaded(self) -> dict[str, tuple[SSMPath, str, SSMParameter]]:
+        """Every loaded parameter below this path by name, with its parent node and key there"""
+        index = {}
+        stack: list[SSMPath] = [self]
+        while stack:
+            node = stack.pop()
+            for key, child in node._children.items():
+                if isinstance(child, SSMParameter):
+                    index[child.name] = (node, key, child)
+                stack.append(child)
+        return index
+
+    def _apply_fetched(
+        self, p: dict[str, Any], index: dict[str, tuple[SSMPath, str, SSMParameter]], changes: TreeChanges
+    ):
+        param = parse_obj_as(SSMParameter, {**p, "Value": ssm_special_to_curly(p["Value"])})
+        param.set_aws_client_kwargs(**self._aws_client_kwargs)
+        parameter_cache.invalidate(param.name)
+        if param.name not in index:
+            changes.added.append(param)
+            return
+        parent, key, old = index[param.name]
+        # share the dict itself, the index still points at it for nodes further down
+        param._children = old._children
+        param._listed = old._listed
+        parent._children[key] = param
+        changes.updated.append(param)
+
+    @staticmethod
+    def _drop_deleted(entry: tuple[SSMPath, str, SSMParameter], changes: TreeChanges):
+        parent, key, old = entry
+        parameter_cache.invalidate(old.name)
+        # the node stays on as a plain directory if there are parameters below it
+        node = parent._new_child(key)
+        node._children = old._children
+        node._listed = True
+        parent._children[key] = node
+        changes.deleted.append(old)
+
+    def iter_parameters(
+        self,
+        recursive: bool = True,
+        fields: Optional[Iterable[str]] = None,
+        filters: Optional[list[dict[str, Any]]] = None,
+    ) -> Iterator[ParameterRecord]:
+        """Yield a :class:`ParameterRecord` for every parameter below this path, page by page.
+
+        Nothing is added to the tree, so memory use doesn't grow with the size of the hierarchy.
+        By default only ``GetParametersByPath`` is used, which covers the name, value, type,
+        version, modification date and data type. Asking for any other ``fields`` lists with
+        ``DescribeParameters`` instead, and if ``value`` is wanted too, each page of 50 is joined
+        with batched ``GetParameters`` calls. ``filters`` are passed on as ``ParameterFilters``.
+        """
+        fields = _VALUE_FIELDS if fields is None else frozenset(fields) | {"name"}
+        unknown = fields - set(ParameterRecord._fields)
+        if unknown:
+            raise ValueError(f"Unknown parameter fields: {', '.join(sorted(unknown))}")
+        ssm = self.ssm_client
+        if fields <= _VALUE_FIELDS:
+            pager = ssm.get_paginator("get_parameters_by_path")
+            for page in pager.paginate(Path=self.name, Recursive=recursive, ParameterFilters=filters or []):
+                yield from (_record(p, fields) for p in page["Parameters"] if not is_chunk_name(p["Name"]))
+            return
+
+        path_filter = {"Key": "Path", "Option": "Recursive" if recursive else "OneLevel", "Values": [self.name]}
+        pager = ssm.get_paginator("describe_parameters")
+        for page in pager.paginate(ParameterFilters=[path_filter, *(filters or [])]):
+            described = [p for p in page["Parameters"] if not is_chunk_name(p["Name"])]
+            if "value" not in fields:
+                yield from (_record(p, fields) for p in described)
+                continue
+            values: dict[str, dict[str, Any]] = {}
+            for batch in _batched([p["Name"] for p in described], GET_PARAMETERS_BATCH_SIZE):
+                values.update((p["Name"], p) for p in ssm.get_parameters(Names=batch)["Parameters"])
+            for p in described:
+                if p["Name"] in values:  # skips anything deleted since the page was listed
+                    yield _record({**p, **values[p["Name"]]}, fields)
+
+    def _prune(self) -> bool:
+        """Drop directories left without any parameters below them; returns whether this one is empty"""
+        for key, child in list(self._children.items()):
+            if child._prune() and not isinstance(child, SSMParameter):
+                del self._children[key]
+        return not self._children
+
+    def _new_child(self, item: str) -> SSMPath:
+        # names are already clean here, so skip validating and PureSSMPath parsing
+        nc = SSMPath.construct(name=f"{self.name.rstrip('/')}/{item}")
+        nc.set_aws_client_kwargs(**self._aws_client_kwargs)
+        nc.set_values_only(self._values_only)
+        return nc
+
+    def _parse_listed(self, p: dict[str, Any], got_metadata: bool) -> SSMParameter:
+        param = parse_obj_as(SSMParameter, {**p, "Value": ssm_special_to_curly(p["Value"])})
+        param.set_aws_client_kwargs(**self._aws_client_kwargs)
+        param._got_metadata = got_metadata  # pylint:disable=protected-access
+        param._stored_value = param.value  # pylint:disable=protected-access
+        return param
+
+    def _relative_parts(self, name: str) -> list[str]:
+        prefix = self.name.rstrip("/") + "/"
+        if not prefix.startswith("/"):
+            prefix = "/" + prefix
+        if not name.startswith("/"):
+            name = "/" + name
+        if not name.startswith(prefix):
+            raise ValueError(f"{name!r} is not below {self.name!r}")
+        return name.removeprefix(prefix).split("/")
+
+    def _insert_parameters(self, params: Iterable[SSMParameter]):
+        """Insert many parameters in one pass, each name split once and placed in O(depth).
+
+        Directory nodes are remembered by their parts, so siblings (which listings return
+        together) find their parent with a single lookup.
+        """
+        dirs: dict[tuple[str, ...], SSMPath] = {(): self}
+        for param in params:
+            *parents, leaf = self._relative_parts(param.name)
+            key = tuple(parents)
+            node = dirs.get(key)
+            if node is None:
+                node = self
+                for i, part in enumerate(parents):
+                    child = dirs.get(key[: i + 1])
+                    if child is None:
+                        child = dirs[key[: i + 1]] = node._child_dir(part)
+                    child._listed = True
+                    node = child
+            node._place(leaf, param)
+            dirs[key + (leaf,)] = param
+
+    def _insert_parameter(self, param: SSMParameter):
+        self._insert_parameters((param,))
+
+    def _child_dir(self, part: str) -> SSMPath:
+        # walk the private dicts directly; going through __getitem__ would list every intermediate node
+        child = self._children.get(part)
+        if child is None:
+            child = self._children[part] = self._new_child(part)
+        child._listed = True
+        return child
+
+    def _place(self, leaf: str, param: SSMParameter):
+        existing = self._children.get(leaf)
+        if existing is not None and existing is not param:
+            param._children.update(existing._children)
+            param._listed = param._listed or existing._listed
+        self._children[leaf] = param
+
+    def loaded_parameters(self) -> Iterator[SSMParameter]:
+        """Yield every parameter already loaded below this path, without fetching anything"""
+        for child in self._children.values():
+            if isinstance(child, SSMParameter):
+                yield child
+            yield from child.loaded_parameters()
+
+    @property
+    def load_timing(self) -> Optional[TreeLoadTiming]:
+        """Timing of the last tree load done by this node, if any"""
+        return self._load_timing
 
     def iterdir(self) -> Iterator[SSMPath]:
         self._fetch_children()
 
         yield from self._children.values()
 
+    async def aiterdir(self) -> AsyncIterator[SSMPath]:
+        await run_sync(self._fetch_children)
+        for child in list(self._children.values()):
+            yield child
+
+    async def afetch_parameters(self, path=None, values_only: Optional[bool] = None):
+        await run_sync(self.fetch_parameters, path, values_only=values_only)
+
     def is_dir(self):
         return True
 
@@ -168,9 +549,16 @@ class SSMPath(BaseModel):
     def set_aws_client_kwargs(self, **kwargs):
         self._aws_client_kwargs = kwargs
 
+    def set_values_only(self, values_only: bool = True):
+        """Only list names, values and versions when loading children below this path.
+
+        Description, tier, key id and allowed pattern are then fetched per parameter on first access.
+        """
+        self._values_only = values_only
+
     @property
-    def ssm_client(self):
-        return boto3.client("ssm", **self._aws_client_kwargs)
+    def ssm_client(self) -> BaseClient:
+        return get_ssm_client(**self._aws_client_kwargs)
 
 
 class SSMParameter(SSMPath):
@@ -187,6 +575,10 @@ class SSMParameter(SSMPath):
     tags: list[Tag] = []  # from list_tags
     _decoded_value: Any = PrivateAttr(default=None)
     _got_tags: bool = PrivateAttr(default=False)
+    _got_metadata: bool = PrivateAttr(default=True)
+    _fetching_metadata: bool = PrivateAttr(default=False)
+    # the raw value last read from or written to SSM, None when not known
+    _stored_value: Optional[str] = PrivateAttr(default=None)
 
     class Config:
         alias_generator = to_camel
@@ -196,8 +588,12 @@ class SSMParameter(SSMPath):
         # if item == "value" and super().__getattribute__("value") is None:
         #     # lazily fetch value upon first read
         #     self._fetch_value()
-        if item == "tags" and not super().__getattribute__("_got_tags"):
-            self._fetch_tags()
+        if item in _LAZY_FIELDS:
+            if item == "tags":
+                if not super().__getattribute__("_got_tags"):
+                    self._fetch_tags()
+            elif not super().__getattribute__("_got_metadata") and not super().__getattribute__("_fetching_metadata"):
+                self._fetch_metadata()
         return super().__getattribute__(item)
 
     def is_dir(self):
@@ -224,48 +620,332 @@ class SSMParameter(SSMPath):
     def _fetch_tags(self):
         ssm: BaseClient = self.ssm_client
         try:
-            tags = ssm.list_tags_for_resource(ResourceType="Parameter", ResourceId=self.name)
+            tags, _ = inflight.do(
+                ("tags", id(ssm), self.name),
+                ssm.list_tags_for_resource,
+                ResourceType="Parameter",
+                ResourceId=self.name,
+            )
             self.tags = parse_obj_as(list[Tag], tags["TagList"])
             self._got_tags = True
         except ssm.exceptions.ParameterNotFound:
             pass
 
+    def _fetch_metadata(self):
+        # only marked as fetched once the describe succeeds, so a failed call is retried on next access
+        self._fetching_metadata = True
+        try:
+            ssm: BaseClient = self.ssm_client
+            described, _ = inflight.do(
+                ("describe", id(ssm), self.name),
+                ssm.describe_parameters,
+                ParameterFilters=[{"Key": "Name", "Option": "Equals", "Values": [self.name]}],
+            )
+            if described["Parameters"]:
+                fetched = parse_obj_as(SSMParameter, described["Parameters"][0])
+                for field in _METADATA_FIELDS:
+                    if field in fetched.__fields_set__:
+                        setattr(self, field, getattr(fetched, field))
+            self._got_metadata = True
+            self._share_metadata()
+        finally:
+            self._fetching_metadata = False
+
+    def _share_metadata(self):
+        # cache hits are copies, so without this every hit would describe the parameter again
+        cached = parameter_cache.peek(self.name)
+        if type(cached) is not type(self) or cached.version != self.version or cached._got_metadata:
+            return
+        # fields first, so a copy taken in between still sees the flag unset
+        cached.__dict__.update({f: self.__dict__[f] for f in _METADATA_FIELDS})
+        cached._got_metadata = True
+
     @property
     def decoded_value(self):
         if self._decoded_value is None:
-            try:
-                decoded_val = base64.b64decode(self.value.strip(), validate=True)
-                self._decoded_value = DumperSigner.load(decoded_val)[0].decode("utf8")
-            except ValueError:
-                self._decoded_value = self.value
+            cache_key = None if self.version is None else (self.name, self.version)
+            self._decoded_value = decode_value(self.value, cache_key, self._read_chunks)
         return self._decoded_value
 
-    def lazy_dict(self):
-        return lazy_dict(self.decoded_value)
+    def _read_chunks(self, manifest: Manifest) -> str:
+        names = [chunk_name(self.name, i) for i in range(manifest.chunks)]
+        ssm = self.ssm_client
+
+        def fetch(batch: list[str]) -> list[dict[str, Any]]:
+            return ssm.get_parameters(Names=batch, WithDecryption=True)["Parameters"]
+
+        batches = list(_batched(names, GET_PARAMETERS_BATCH_SIZE))
+        pages = [fetch(batches[0])] if len(batches) == 1 else _get_loader_executor().map(fetch, batches)
+        values = {p["Name"]: p["Value"] for page in pages for p in page}
+        return join_chunks(manifest, [values[n] for n in names if n in values])
+
+    def _write_chunks(self, value: str) -> tuple[str, int]:
+        """Write ``value`` as chunks below this parameter, returning the manifest to store in it"""
+        manifest, chunks = split_chunks(value, CHUNK_SIZE)
+        params = []
+        for i, chunk in enumerate(chunks):
+            param = SSMParameter(Name=chunk_name(self.name, i), Value=chunk, Type=self.type, KeyId=self.key_id)
+            param.set_aws_client_kwargs(**self._aws_client_kwargs)
+            params.append(param)
+        logger.info("Writing %s as %d chunks", self.name, len(chunks))
+        failed = [r.error for r in SSMParameter.put_parameters(params) if r.error is not None]
+        if failed:
+            raise failed[0]
+        return manifest, len(chunks)
+
+    def _drop_chunks(self, keep: int):
+        """Delete chunks left over from an earlier, bigger value"""
+        ssm = self.ssm_client
+        pager = ssm.get_paginator("describe_parameters")
+        chunk_dir = chunk_name(self.name, 0).rpartition("/")[0]
+        stale = []
+        for page in pager.paginate(ParameterFilters=[{"Key": "Path", "Option": "OneLevel", "Values": [chunk_dir]}]):
+            for p in page["Parameters"]:
+                index = p["Name"].rpartition("/")[2]
+                if index.isdigit() and int(index) >= keep:
+                    stale.append(p["Name"])
+        for batch in _batched(stale, GET_PARAMETERS_BATCH_SIZE):
+            ssm.delete_parameters(Names=batch)
+
+    def lazy_dict(self, fmt: Optional[str] = None, round_trip: bool = True):
+        if fmt is None and self._got_tags:
+            # only use a format tag if the tags are already here; fetching them costs more than sniffing
+            fmt = next((t.value for t in self.tags if t.key == FORMAT_TAG), None)
+        value = self.decoded_value
+        start = instrumentation.start()
+        parsed = lazy_dict(value, fmt=fmt, round_trip=round_trip)
+        instrumentation.record("parse", fmt or "sniffed", start, self.name, bytes_received=len(value))
+        return parsed
+
+    @classmethod
+    def _cached(cls, name: str):
+        cached = parameter_cache.get(name, None)
+        if cached is not None and type(cached) is cls:  # pylint:disable=unidiomatic-typecheck
+            return cached.copy(deep=True)
+        return None
+
+    @classmethod
+    def _from_response(
+        cls, param: dict[str, Any], got_metadata: bool = True, got_tags: bool = False, cache: bool = True
+    ):
+        param["Value"] = ssm_special_to_curly(param["Value"])
+        new_param = parse_obj_as(cls, param)
+        new_param._got_metadata = got_metadata
+        new_param._got_tags = got_tags
+        new_param._stored_value = new_param.value
+        if cache:
+            parameter_cache.set(new_param.name, new_param.copy(deep=True))
+        return new_param
+
+    @classmethod
+    def get_parameter(
+        cls,
+        name: str,
+        default_value: str = "",
+        use_cache: bool = True,
+        prefetch: bool = False,
+        values_only: Optional[bool] = None,
+    ):
+        """Fetch a parameter from SSM, or return one holding ``default_value`` if it doesn't exist.
+
+        Only ``GetParameter`` is called; the description, tier etc. and the tags are fetched on first
+        access, unless ``prefetch`` is set to load them all up front. ``values_only`` is kept for
+        compatibility: loading values only is now the default, and ``values_only=True`` overrides
+        ``prefetch``.
+
+        Found parameters are kept in :data:`~ssm_parameter_config.cache.parameter_cache`; pass
+        ``use_cache=False`` to always go to SSM (the fresh result still refreshes the cache).
+        """
+        if values_only:
+            prefetch = False
+        if use_cache and (cached := cls._cached(name)) is not None:
+            return cached
+        # concurrent fetches of the same parameter share one round trip
+        param, shared = inflight.do(
+            (cls, "get", name, default_value, prefetch), cls._fetch_parameter, name, default_value, prefetch
+        )
+        return param.copy(deep=True) if shared else param
 
     @classmethod
-    def get_parameter(cls, name: str, default_value: str = ""):
-        ssm = boto3.client("ssm")
+    def _fetch_parameter(cls, name: str, default_value: str, prefetch: bool):
+        ssm = get_ssm_client()
         try:
             param = ssm.get_parameter(Name=name)["Parameter"]
+            if not prefetch:
+                return cls._from_response(param, got_metadata=False)
             param.update(ssm.describe_parameters(ParameterFilters=[{"Key": "Name", "Values": [name]}])["Parameters"][0])
             tags = ssm.list_tags_for_resource(ResourceType="Parameter", ResourceId=name)
             param["Tags"] = tags["TagList"]
-            param["Value"] = ssm_special_to_curly(param["Value"])
-            return parse_obj_as(cls, param)
-        except (IndexError, ssm.exceptions.ParameterNotFound):
-            pass
-        return cls(Name=name, Value=default_value)
+        except (IndexError, ssm.exceptions.ParameterNotFound, ssm.exceptions.InvalidResourceId):
+            return cls(Name=name, Value=default_value)
+        return cls._from_response(param, got_tags=True)
+
+    @classmethod
+    async def aget_parameter(
+        cls,
+        name: str,
+        default_value: str = "",
+        use_cache: bool = True,
+        prefetch: bool = False,
+        values_only: Optional[bool] = None,
+    ):
+        """Async :meth:`get_parameter`; with ``prefetch`` the value, description and tag calls run concurrently"""
+        if values_only:
+            prefetch = False
+        if use_cache and (cached := cls._cached(name)) is not None:
+            return cached
+        if not prefetch:
+            return await run_sync(cls.get_parameter, name, default_value, use_cache=False)
+        ssm = get_ssm_client()
+        try:
+            got, described, tags = await gather_sync(
+                [
+                    functools.partial(ssm.get_parameter, Name=name),
+                    functools.partial(ssm.describe_parameters, ParameterFilters=[{"Key": "Name", "Values": [name]}]),
+                    functools.partial(ssm.list_tags_for_resource, ResourceType="Parameter", ResourceId=name),
+                ]
+            )
+            param = got["Parameter"]
+            param.update(described["Parameters"][0])
+            param["Tags"] = tags["TagList"]
+        except (IndexError, ssm.exceptions.ParameterNotFound, ssm.exceptions.InvalidResourceId):
+            return cls(Name=name, Value=default_value)
+        return cls._from_response(param, got_tags=True)
+
+    @classmethod
+    def get_parameters(
+        cls, *names: str, default_value: str = "", use_cache: bool = True, values_only: bool = False
+    ) -> dict[str, SSMParameter]:
+        """Fetch many parameters at once, using batched ``GetParameters`` and ``DescribeParameters`` calls.
+
+        Returns a dict keyed by name in the order given; names that don't exist in SSM map to a
+        parameter holding ``default_value``, just like :meth:`get_parameter`. Tags are left to be
+        fetched lazily, since SSM has no bulk tag API.
+        """
+        found: dict[str, SSMParameter] = {}
+        to_fetch = []
+        for name in dict.fromkeys(names):
+            if use_cache and (cached := cls._cached(name)) is not None:
+                found[name] = cached
+            else:
+                to_fetch.append(name)
+
+        for name, p in cls._fetch_many(to_fetch, values_only).items():
+            found[name] = cls._from_response(p, got_metadata=not values_only)
+        return {name: found.get(name) or cls(Name=name, Value=default_value) for name in names}
 
     @staticmethod
-    def get_parameter_value(val):
-        if len(val) > 4096:
-            val = base64.b64encode(DumperSigner().dump(val.encode("utf8"))).decode("utf8")
+    def _fetch_many(
+        names: list[str], values_only: bool = False, with_decryption: bool = False
+    ) -> dict[str, dict[str, Any]]:
+        """Raw responses for the ``names`` that exist, with their metadata unless ``values_only``"""
+        ssm = get_ssm_client()
+        raw: dict[str, dict[str, Any]] = {}
+        for batch in _batched(names, GET_PARAMETERS_BATCH_SIZE):
+            for p in ssm.get_parameters(Names=batch, WithDecryption=with_decryption)["Parameters"]:
+                raw[p["Name"]] = p
+        desc_pager = ssm.get_paginator("describe_parameters")
+        for batch in _batched([] if values_only else list(raw), DESCRIBE_FILTER_BATCH_SIZE):
+            for page in desc_pager.paginate(ParameterFilters=[{"Key": "Name", "Option": "Equals", "Values": batch}]):
+                for p in page["Parameters"]:
+                    if p["Name"] in raw:
+                        raw[p["Name"]] = {**p, **raw[p["Name"]]}
+        return raw
 
-        return ssm_curly_to_special(val)
+    @classmethod
+    async def aget_parameters(
+        cls, *names: str, default_value: str = "", use_cache: bool = True, values_only: bool = False
+    ) -> dict[str, SSMParameter]:
+        """Async :meth:`get_parameters`, fetching the ``GetParameters`` batches concurrently"""
+        batches = await gather_sync(
+            functools.partial(
+                cls.get_parameters, *batch, default_value=default_value, use_cache=use_cache, values_only=values_only
+            )
+            for batch in _batched(list(dict.fromkeys(names)), GET_PARAMETERS_BATCH_SIZE)
+        )
+        found = {k: v for batch in batches for k, v in batch.items()}
+        return {name: found[name] for name in names}
+
+    @staticmethod
+    def get_parameter_value(val, codec: Optional[str] = None):
+        return ssm_curly_to_special(encode_value(val, codec))
+
+    def plan_write(self, current: SSMParameter, new_value: Optional[str] = None) -> WritePlan:
+        """Compare this parameter (or ``new_value``) against ``current``, as fetched from SSM"""
+        value = new_value or self.value
+        if value is None:
+            raise ValueError(f"{self.name} has no value to write")
+        new_hash = content_hash(value)
+        if current.version is None:
+            return WritePlan(self.name, WriteAction.create, None, None, new_hash)
+        current_hash = content_hash(current.decoded_value)
+        # metadata that was never loaded still holds the defaults (e.g. tier Standard), so it can't
+        # count as a change; read __dict__ so that lazy fields aren't fetched for the comparison
+        fields = _WRITE_FIELDS if self._got_metadata else _VALUE_WRITE_FIELDS
+        changed = current_hash != new_hash or any(
+            self.__dict__[f] is not None and self.__dict__[f] != current.__dict__[f] for f in fields
+        )
+        action = WriteAction.update if changed else WriteAction.noop
+        return WritePlan(self.name, action, current.version, current_hash, new_hash)
 
-    def put_parameter(self, new_value=None, as_cli_input: bool = False):
+    @classmethod
+    def plan_writes(cls, params: Iterable[SSMParameter]) -> list[WritePlan]:
+        """Diff many parameters against SSM with batched calls, without writing anything"""
+        return [plan for plan, _ in cls._plan_writes(list(params))]
+
+    @classmethod
+    def _plan_writes(cls, params: list[SSMParameter]) -> list[tuple[WritePlan, SSMParameter]]:
+        current = cls._fetch_current(params)
+        return [(p.plan_write(current[p.name]), current[p.name]) for p in params]
+
+    @classmethod
+    def _fetch_current(cls, params: list[SSMParameter]) -> dict[str, SSMParameter]:
+        """The stored parameters to diff ``params`` against; missing ones have no version"""
+        names = list(dict.fromkeys(p.name for p in params))
+        # decrypted, so that SecureStrings are compared by their values; kept out of the cache, which
+        # holds values the way GetParameter returns them
+        raw = cls._fetch_many(names, with_decryption=True)
+        return {n: cls._from_response(raw[n], cache=False) if n in raw else cls(Name=n, Value="") for n in names}
+
+    def _adopt_current(self, current: SSMParameter):
+        # the diff already fetched and described the stored parameter; saves put_parameter doing it again
+        self._stored_value = "" if current.version is None else current.value
+        if not self._got_metadata and current._got_metadata:
+            for field in _METADATA_FIELDS:
+                if field in current.__fields_set__:
+                    setattr(self, field, current.__dict__[field])
+            self._got_metadata = True
+
+    def put_parameter(
+        self,
+        new_value=None,
+        as_cli_input: bool = False,
+        skip_unchanged: bool = False,
+        expected_version: Optional[int] = None,
+    ):
+        """Write this parameter (or ``new_value`` under its name) to SSM.
+
+        With ``skip_unchanged`` the stored parameter is fetched first and nothing is written if its
+        value and settings already match. ``expected_version`` makes the write fail with
+        :class:`VersionConflictError` unless the stored parameter is at that version (``0``: doesn't
+        exist yet). SSM has no conditional writes, so this check can't rule out a writer racing in
+        between the check and the write.
+        """
+        if not as_cli_input and (skip_unchanged or expected_version is not None):
+            plan, current = self._plan_writes([self])[0]
+            self._adopt_current(current)
+            if expected_version is not None and (plan.current_version or 0) != expected_version:
+                raise VersionConflictError(self.name, expected_version, plan.current_version)
+            if skip_unchanged and plan.action is WriteAction.noop:
+                logger.debug("%s is unchanged, not writing it", self.name)
+                self.version = plan.current_version
+                if instrumentation.enabled:
+                    instrumentation.emit(InstrumentEvent("put", WriteAction.noop.value, self.name, 0.0))
+                return None
+        start = instrumentation.start()
         val = self.get_parameter_value(new_value or self.value)
+        if not self._got_metadata:
+            self._fetch_metadata()
         kwargs = self.dict(
             exclude_none=True,
             # exclude_defaults=True,
@@ -278,6 +958,87 @@ class SSMParameter(SSMPath):
         kwargs["Overwrite"] = True
         if as_cli_input:
             return kwargs
-        ssm = boto3.client("ssm")
-        ssm.put_parameter(**kwargs)
+        limit = STANDARD_VALUE_LIMIT if self.tier == SSMTier.standard else ADVANCED_VALUE_LIMIT
+        chunks = None
+        if len(val) > limit:
+            # chunks go first, so the manifest never points at chunks that aren't there yet
+            kwargs["Value"], chunks = self._write_chunks(val)
+        # a value that was chunked before leaves chunks behind even when the new one fits. Only look
+        # for them when the stored value is known to be a manifest, so plain writes stay one call
+        stored = self._stored_value
+        had_chunks = stored is not None and parse_manifest(stored) is not None
+        ssm = self.ssm_client
+        response = ssm.put_parameter(**kwargs)
+        parameter_cache.invalidate(self.name)
+        self.version = response.get("Version", self.version)
+        self._stored_value = kwargs["Value"]
+        if chunks is not None or had_chunks:
+            self._drop_chunks(keep=chunks or 0)
+        instrumentation.record(
+            "put", "chunked" if chunks is not None else "single", start, self.name, bytes_sent=len(val)
+        )
         return None
+
+    async def aput_parameter(
+        self,
+        new_value=None,
+        as_cli_input: bool = False,
+        skip_unchanged: bool = False,
+        expected_version: Optional[int] = None,
+    ):
+        return await run_sync(
+            self.put_parameter,
+            new_value,
+            as_cli_input=as_cli_input,
+            skip_unchanged=skip_unchanged,
+            expected_version=expected_version,
+        )
+
+    @classmethod
+    def put_parameters(
+        cls,
+        params: Iterable[SSMParameter],
+        max_workers: int = 8,
+        skip_unchanged: bool = False,
+        check_versions: bool = False,
+    ) -> list[WriteResult]:
+        """Write many parameters concurrently, going no faster than the shared rate limiter allows.
+
+        Every parameter is attempted; failures are reported in the results (in input order) rather
+        than raised. ``skip_unchanged`` and ``check_versions`` (expect each stored parameter to be
+        at the parameter's ``version``) work like the arguments to :meth:`put_parameter`, but fetch
+        the stored parameters with batched calls up front.
+        """
+        params = list(params)
+        if not params:
+            return []
+        diff = skip_unchanged or check_versions
+        current = cls._fetch_current(params) if diff else {}
+        write_errors: tuple[type[Exception], ...] = (*client_errors(), VersionConflictError)
+
+        def write(i: int) -> WriteResult:
+            param = params[i]
+            expected = param.version or 0
+            action = None
+            try:
+                if diff:
+                    param._adopt_current(current[param.name])  # pylint:disable=protected-access
+                    plan = param.plan_write(current[param.name])
+                    action = plan.action
+                    if check_versions and (plan.current_version or 0) != expected:
+                        raise VersionConflictError(param.name, expected, plan.current_version)
+                    if skip_unchanged and action is WriteAction.noop:
+                        param.version = plan.current_version
+                        return WriteResult(param.name, True, param.version, None, action)
+                param.put_parameter()
+            except write_errors as exc:
+                logger.warning("Writing %s failed: %s", param.name, exc)
+                return WriteResult(param.name, False, None, exc, action)
+            except Exception as exc:  # pylint:disable=broad-except
+                # e.g. a value that can't be encoded; one bad item mustn't sink the rest of the batch
+                logger.exception("Writing %s failed", param.name)
+                return WriteResult(param.name, False, None, exc, action)
+            return WriteResult(param.name, True, param.version, None, action)
+
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(params))) as pool:
+            return list(pool.map(write, range(len(params))))
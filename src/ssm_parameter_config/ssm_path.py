@@ -4,11 +4,9 @@ from __future__ import annotations
 from pathlib import PurePath, _PosixFlavour  # type:ignore
 from urllib.parse import quote_from_bytes as urlquote_from_bytes
 
-import boto3
-
 
 class _SSMFlavour(_PosixFlavour):
-    is_supported = bool(boto3)
+    is_supported = True
 
     def parse_parts(self, parts):
         drv, root, parsed = super().parse_parts(parts)
@@ -5,14 +5,19 @@ import json
 import random
 import string
 import sys
+from pathlib import Path
 
 import click
 
 from ssm_parameter_config import SSMConfig, SSMParameter  # nodep
+from ssm_parameter_config.ssm_parameter import (  # nodep
+    VersionConflictError,
+    WriteAction,
+)
 
 
 @click.command()
-@click.argument("input_file", type=click.Path(file_okay=True, dir_okay=False, path_type=str, allow_dash=True))
+@click.argument("input_file", type=click.Path(file_okay=True, dir_okay=True, path_type=str, allow_dash=True))
 @click.argument("output", type=click.File("w"), default="-")
 @click.option("--ssm-config-format", type=click.Choice(["json", "yaml"]), default="yaml")
 @click.option("--output-format", type=click.Choice(["json", "shell"]), default="json")
@@ -23,6 +28,15 @@ from ssm_parameter_config import SSMConfig, SSMParameter  # nodep
 @click.option("--parameter-name", type=click.STRING, default=None)
 @click.option("--parameter-base-name", type=click.STRING, default="")
 @click.option("--pretty-print-json", is_flag=True, default=True)
+@click.option("--max-workers", type=click.INT, default=8, help="Concurrent writes when pushing a directory")
+@click.option("--plan", is_flag=True, help="Only list the parameters that would be created, updated or left alone")
+@click.option("--skip-unchanged", is_flag=True, help="Don't write parameters whose value and settings already match")
+@click.option(
+    "--expected-version",
+    type=click.INT,
+    default=None,
+    help="Fail unless the stored parameter is at this version (0: doesn't exist yet); single file only",
+)
 def cli(
     input_file: str,
     output,
@@ -35,7 +49,33 @@ def cli(
     parameter_name,
     parameter_base_name,
     pretty_print_json,
+    max_workers,
+    plan,
+    skip_unchanged,
+    expected_version,
 ):
+    if Path(input_file).is_dir():
+        if parameter_name is not None:
+            raise click.UsageError("--parameter-name can't be used with a directory; use --parameter-base-name")
+        if expected_version is not None:
+            raise click.UsageError("--expected-version can't be used with a directory")
+        output.write(
+            main_many(
+                input_file,
+                ssm_config_format,
+                push_to_aws,
+                output_format,
+                as_config,
+                extra_import,
+                extra_import_path,
+                parameter_base_name,
+                pretty_print_json,
+                max_workers,
+                plan=plan,
+                skip_unchanged=skip_unchanged,
+            )
+        )
+        return
     if parameter_name is None:
         if input_file == "-":
             raise click.UsageError("Need to specify --parameter_name if reading from STDIN")
@@ -52,10 +92,30 @@ def cli(
             extra_import_path,
             parameter_full_name,
             pretty_print_json,
+            plan=plan,
+            skip_unchanged=skip_unchanged,
+            expected_version=expected_version,
         )
     )
 
 
+def _import_extras(extra_import, extra_import_path):
+    for eip in extra_import_path:
+        sys.path.append(str(eip))
+    for ei in extra_import:
+        importlib.import_module(ei)
+
+
+def _read_parameter(input_file, ssm_config_format, as_config, parameter_full_name):
+    if as_config:
+        input_ssm_cfg = SSMConfig.from_file(input_file)
+        return input_ssm_cfg.to_parameter(
+            exp_format=ssm_config_format, ssm_parameter_path=parameter_full_name, ignore_current=True
+        )
+    with click.open_file(input_file, "r", encoding="utf8") as fh:
+        return SSMParameter(Name=parameter_full_name, Value=fh.read())
+
+
 def main(
     input_file,
     ssm_config_format,
@@ -66,22 +126,81 @@ def main(
     extra_import_path,
     parameter_full_name,
     pretty_print_json,
+    plan=False,
+    skip_unchanged=False,
+    expected_version=None,
 ):
     if as_config:
-        for eip in extra_import_path:
-            sys.path.append(str(eip))
-        for ei in extra_import:
-            importlib.import_module(ei)
-        input_ssm_cfg = SSMConfig.from_file(input_file)
-        input_ssm = input_ssm_cfg.to_parameter(
-            exp_format=ssm_config_format, ssm_parameter_path=parameter_full_name, ignore_current=True
-        )
-    else:
-        with click.open_file(input_file, "r", encoding="utf8") as fh:
-            input_ssm = SSMParameter(Name=parameter_full_name, Value=fh.read())
-    out = input_ssm.put_parameter(as_cli_input=not push_to_aws)
+        _import_extras(extra_import, extra_import_path)
+    input_ssm = _read_parameter(input_file, ssm_config_format, as_config, parameter_full_name)
+    if plan:
+        return _format_plans(SSMParameter.plan_writes([input_ssm]))
     if push_to_aws:
+        try:
+            input_ssm.put_parameter(skip_unchanged=skip_unchanged, expected_version=expected_version)
+        except VersionConflictError as exc:
+            raise click.ClickException(str(exc)) from exc
         return ""
+    out = input_ssm.put_parameter(as_cli_input=True)
+    return _format_cli_input(out, output_format, pretty_print_json)
+
+
+def main_many(
+    input_dir,
+    ssm_config_format,
+    push_to_aws,
+    output_format,
+    as_config,
+    extra_import,
+    extra_import_path,
+    parameter_base_name,
+    pretty_print_json,
+    max_workers=8,
+    plan=False,
+    skip_unchanged=False,
+):
+    """Like :func:`main`, for every file in ``input_dir``, writing them concurrently when pushing"""
+    if as_config:
+        _import_extras(extra_import, extra_import_path)
+    files = sorted(p for p in Path(input_dir).iterdir() if p.is_file() and not p.name.startswith("."))
+    params = [_read_parameter(str(f), ssm_config_format, as_config, parameter_base_name + f.name) for f in files]
+    if plan:
+        return _format_plans(SSMParameter.plan_writes(params))
+    if not push_to_aws:
+        return "".join(
+            _format_cli_input(p.put_parameter(as_cli_input=True), output_format, pretty_print_json) + "\n"
+            for p in params
+        )
+    results = SSMParameter.put_parameters(params, max_workers=max_workers, skip_unchanged=skip_unchanged)
+    failed = [r for r in results if not r.ok]
+    output = "".join(
+        f"{r.name}: {'unchanged at ' if r.action is WriteAction.noop else ''}version {r.version}\n"
+        if r.ok
+        else f"{r.name}: FAILED ({r.error})\n"
+        for r in results
+    )
+    if failed:
+        click.echo(output, err=True, nl=False)
+        raise click.ClickException(f"{len(failed)} of {len(results)} parameters failed to write")
+    return output
+
+
+def _format_plans(plans):
+    output = ""
+    for plan in plans:
+        if plan.action is WriteAction.create:
+            output += f"create  {plan.name}\n"
+        else:
+            output += f"{plan.action.value:<8}{plan.name} (version {plan.current_version})\n"
+    counts = {action: sum(p.action is action for p in plans) for action in WriteAction}
+    output += (
+        f"{counts[WriteAction.create]} to create, {counts[WriteAction.update]} to update, "
+        f"{counts[WriteAction.noop]} unchanged\n"
+    )
+    return output
+
+
+def _format_cli_input(out, output_format, pretty_print_json):
     output = ""
     if output_format == "shell":
         var_name = "".join(random.choices(string.ascii_letters, k=10))  # nosec B311
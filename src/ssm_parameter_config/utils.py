@@ -2,12 +2,11 @@
 from __future__ import annotations
 
 import json
+import re
 from io import StringIO
+from typing import Any, Optional
 
-import dotenv
-from ruamel.yaml import YAMLError
-
-from ._yaml import yaml
+from ._yaml import get_yaml, get_yaml_safe, yaml_error
 
 SSM_PARAMETER_SUBSTITUTION = (
     ("{{", "ʃ"),  # U+0283	ʃ	ca 83	LATIN SMALL LETTER ESH
@@ -27,14 +26,85 @@ def ssm_special_to_curly(val):
     return val
 
 
-def lazy_dict(value):
-    """First try as json, then try as yaml, and then try as env file"""
-    try:
-        return json.loads(value)
-    except json.decoder.JSONDecodeError:
-        pass
-    try:
-        return yaml.load(value)
-    except YAMLError:
-        pass
-    return dict(dotenv.dotenv_values(stream=StringIO(value)))
+FORMATS = ("json", "yaml", "env")
+# an optional first line naming the format, e.g. "# format: env"
+FORMAT_HEADER = re.compile(r"#\s*format\s*[:=]\s*(json|yaml|env)\s*(?:\r?\n|$)")
+_ENV_LINE = re.compile(r"(?:export\s+)?[A-Za-z_][A-Za-z0-9_.]*\s*=")
+_FIRST_CHAR = re.compile(r"^[ \t]*([^\s#])", re.MULTILINE)
+# KEY=value lines with nothing for dotenv to unescape or interpolate
+_SIMPLE_ENV_LINE = re.compile(
+    r"[ \t]*(?:export[ \t]+)?([A-Za-z_][A-Za-z0-9_.]*)[ \t]*=[ \t]*"
+    r"(?:'([^'\\\r\n]*)'|([^\s'\"\\$#]*(?:[ \t]+[^\s'\"\\$#]+)*))[ \t]*"
+)
+
+
+def format_header(fmt: str) -> str:
+    return f"# format: {fmt}\n"
+
+
+def split_format_header(value: str) -> tuple[Optional[str], str]:
+    """Return the format named by a header line (if any) and the value without it"""
+    if value.startswith("#"):
+        match = FORMAT_HEADER.match(value)
+        if match:
+            end = match.end()
+            return match.group(1), value[end:]
+    return None, value
+
+
+def sniff_format(value: str) -> str:
+    """Guess the format from the first meaningful character/line, without parsing anything"""
+    match = _FIRST_CHAR.search(value)
+    if match is None:
+        return "yaml"
+    if match.group(1) in "{[":
+        return "json"
+    if _ENV_LINE.match(value, match.start(1)):
+        return "env"
+    return "yaml"
+
+
+def _load_json(value: str, round_trip: bool) -> Any:  # pylint:disable=unused-argument
+    return json.loads(value)
+
+
+def _load_yaml(value: str, round_trip: bool) -> Any:
+    return (get_yaml() if round_trip else get_yaml_safe()).load(value)
+
+
+def _load_env(value: str, round_trip: bool) -> Any:  # pylint:disable=unused-argument
+    # python-dotenv's parser is slow on big files, so plain KEY=value files are parsed here instead
+    out = {}
+    for line in value.splitlines():
+        if not line.strip() or line.lstrip().startswith("#"):
+            continue
+        match = _SIMPLE_ENV_LINE.fullmatch(line)
+        if match is None:
+            import dotenv  # pylint:disable=import-outside-toplevel
+
+            return dict(dotenv.dotenv_values(stream=StringIO(value)))
+        key, quoted, unquoted = match.groups()
+        out[key] = quoted if quoted is not None else unquoted
+    return out
+
+
+_LOADERS = {"json": _load_json, "yaml": _load_yaml, "env": _load_env}
+
+
+def lazy_dict(value: str, fmt: Optional[str] = None, round_trip: bool = True):
+    """Parse a json, yaml or env file.
+
+    The format comes from ``fmt``, else a ``# format: ...`` header line, else a guess from the
+    first meaningful line. If parsing in that format fails, the other formats are tried in the
+    order json, yaml, env. ``round_trip=False`` loads yaml with the faster safe loader.
+    """
+    header_fmt, value = split_format_header(value)
+    fmt = fmt or header_fmt or sniff_format(value)
+    if fmt not in _LOADERS:
+        raise ValueError(f"Format {fmt} not supported.")
+    for name in (fmt,) + tuple(f for f in FORMATS if f != fmt):
+        try:
+            return _LOADERS[name](value, round_trip)
+        except (json.decoder.JSONDecodeError, yaml_error()):
+            pass
+    return _load_env(value, round_trip)
@@ -11,6 +11,7 @@ import pytest
 from moto import mock_ssm
 
 from ssm_parameter_config import SSMConfig, SSMParameter
+from ssm_parameter_config.cache import parameter_cache
 from ssm_parameter_config.utils import ssm_curly_to_special
 
 
@@ -29,6 +30,23 @@ def ssm_config(config_yaml):
     return cfg
 
 
+@pytest.fixture(autouse=True)
+def clear_parameter_cache():
+    parameter_cache.invalidate()
+    parameter_cache.reset_stats()
+    yield
+    parameter_cache.invalidate()
+
+
+@pytest.fixture(scope="function")
+def scratch_registry(monkeypatch):
+    """Config classes defined during the test are dropped from the dispatch registry afterwards"""
+    from ssm_parameter_config import ssm_config
+
+    monkeypatch.setattr(ssm_config, "_ssm_config_classes", list(ssm_config._ssm_config_classes))
+    monkeypatch.setattr(ssm_config, "_dispatch_index", None)
+
+
 @pytest.fixture(scope="function")
 def aws_credentials():
     """Mocked AWS Credentials for moto."""
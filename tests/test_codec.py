@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+#  pylint: disable=import-outside-toplevel
+from __future__ import annotations
+
+import base64
+import random
+import zlib
+
+import pytest
+from signed_pickle import DumperSigner
+
+from ssm_parameter_config import codec
+from ssm_parameter_config.codec import (
+    MAGIC,
+    decode_cache,
+    decode_value,
+    encode_value,
+    register_codec,
+)
+
+LARGE_VALUE = "".join(f"key_{i}: some value {{{{x}}}}\n" for i in range(600))
+
+
+class TestCodec:
+    def test_round_trip(self):
+        assert encode_value("short") == "short"
+        encoded = encode_value(LARGE_VALUE)
+        assert encoded.startswith(f"{MAGIC}{codec.DEFAULT_CODEC}:")
+        assert len(encoded) < 4096 < len(LARGE_VALUE)
+        assert "{" not in encoded
+        assert decode_value(encoded) == LARGE_VALUE
+        assert decode_value(encode_value(LARGE_VALUE, "zlib")) == LARGE_VALUE
+
+    def test_plain_and_legacy_values(self):
+        assert decode_value("plain value") == "plain value"
+        assert decode_value("1d but not base64") == "1d but not base64"
+        assert decode_value("1day") == "1day"
+        legacy = base64.b64encode(DumperSigner().dump(LARGE_VALUE.encode("utf8"))).decode("utf8")
+        assert decode_value(legacy) == LARGE_VALUE
+
+    def test_unknown_codec(self):
+        with pytest.raises(ValueError):
+            encode_value(LARGE_VALUE, "nope")
+        with pytest.raises(ValueError):
+            decode_value(f"{MAGIC}nope:AAAA")
+
+    def test_registry_and_cache(self):
+        calls = []
+
+        def decode(data):
+            calls.append(data)
+            return zlib.decompress(data)
+
+        register_codec("plainzlib", zlib.compress, decode)
+        try:
+            encoded = encode_value(LARGE_VALUE, "plainzlib")
+            decode_cache.clear()
+            assert decode_value(encoded, ("/p", 1)) == LARGE_VALUE
+            assert decode_value(encoded, ("/p", 1)) == LARGE_VALUE
+            assert len(calls) == 1
+            # same key but different contents never comes back from the cache
+            assert decode_value(encode_value(LARGE_VALUE * 2, "plainzlib"), ("/p", 1)) == LARGE_VALUE * 2
+        finally:
+            codec._codecs.pop("plainzlib")  # pylint:disable=protected-access
+
+    def test_parameter_round_trip(self, ssm):
+        from ssm_parameter_config import SSMParameter
+
+        SSMParameter(Name="/codec/large", Value=LARGE_VALUE).put_parameter()
+        stored = ssm.get_parameter(Name="/codec/large")["Parameter"]["Value"]
+        assert stored.startswith(MAGIC)
+        param = SSMParameter.get_parameter("/codec/large")
+        assert param.decoded_value == LARGE_VALUE
+        assert param.lazy_dict()["key_599"] == "some value {{x}}"
+
+    def test_chunked_parameter(self, ssm, monkeypatch):
+        from ssm_parameter_config import SSMParameter, SSMPath
+        from ssm_parameter_config.codec import ChunkError
+
+        # incompressible, so the encoded value needs several chunks
+        big = base64.b64encode(random.Random(0).randbytes(12000)).decode()
+        param = SSMParameter(Name="/codec/big", Value=big)
+        param.put_parameter()
+        manifest = ssm.get_parameter(Name="/codec/big")["Parameter"]["Value"]
+        assert manifest.startswith(codec.CHUNK_MAGIC)
+        chunks = sorted(p["Name"] for p in ssm.describe_parameters()["Parameters"] if "/_chunk/" in p["Name"])
+        assert len(chunks) == codec.parse_manifest(manifest).chunks > 1
+
+        calls = []
+        original = SSMParameter._read_chunks  # pylint:disable=protected-access
+        monkeypatch.setattr(SSMParameter, "_read_chunks", lambda self, m: calls.append(m) or original(self, m))
+        fetched = SSMParameter.get_parameter("/codec/big")
+        assert fetched.decoded_value == big and len(calls) == 1
+
+        # shrinking drops the chunks that aren't needed any more
+        SSMParameter(Name="/codec/big", Value=big[: len(big) // 3]).put_parameter()
+        left = [p["Name"] for p in ssm.describe_parameters()["Parameters"] if "/_chunk/" in p["Name"]]
+        assert len(left) == codec.parse_manifest(ssm.get_parameter(Name="/codec/big")["Parameter"]["Value"]).chunks
+
+        ssm.put_parameter(Name="/codec/big/_chunk/0", Value="tampered", Type="String", Overwrite=True)
+        with pytest.raises(ChunkError):
+            _ = SSMParameter.get_parameter("/codec/big", use_cache=False).decoded_value
+
+        # the chunks aren't listed as parameters of their own
+        root = SSMPath(name="/codec")
+        assert [c.name for c in root.iterdir()] == ["/codec/big"]
+        assert list(root["big"].iterdir()) == []
+        assert [r.name for r in root.iter_parameters()] == ["/codec/big"]
+        assert [r.name for r in root.iter_parameters(fields=["name", "tier"])] == ["/codec/big"]
+        assert not root.refresh()
+
+        def chunk_names():
+            return [p["Name"] for p in ssm.describe_parameters()["Parameters"] if "/_chunk/" in p["Name"]]
+
+        drops = []
+        original_drop = SSMParameter._drop_chunks  # pylint:disable=protected-access
+        monkeypatch.setattr(
+            SSMParameter, "_drop_chunks", lambda self, keep: drops.append(self.name) or original_drop(self, keep)
+        )
+
+        # a value that fits in one parameter again drops every chunk when the stored value is known
+        # to be a manifest
+        SSMParameter.get_parameter("/codec/big", use_cache=False).put_parameter("small")
+        assert chunk_names() == [] and drops == ["/codec/big"]
+        param = SSMParameter(Name="/codec/big", Value=big)
+        param.put_parameter()
+        param.put_parameter("small")
+        assert chunk_names() == [] and len(drops) == 3
+
+        # plain writes of an unknown stored value don't look for chunks; stale ones are unreachable
+        drops.clear()
+        param = SSMParameter(Name="/codec/big", Value=big)
+        param.put_parameter()
+        SSMParameter(Name="/codec/big", Value="small").put_parameter()
+        SSMParameter(Name="/codec/plain", Value="small").put_parameter()
+        assert drops == ["/codec/big"] and chunk_names()
+        assert SSMParameter.get_parameter("/codec/big", use_cache=False).decoded_value == "small"
+        assert [r.name for r in root.iter_parameters()] == ["/codec/big", "/codec/plain"]
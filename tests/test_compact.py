@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+#  pylint: disable=import-outside-toplevel
+from __future__ import annotations
+
+import pytest
+
+
+class TestCompactTree:
+    def test_load_and_convert(self, ssm):
+        from ssm_parameter_config import SSMParameter, SSMPath
+        from ssm_parameter_config.compact import CompactTree
+
+        for name in ("/ct/a", "/ct/b/c", "/ct/b/d", "/ct/b/c/e"):
+            ssm.put_parameter(Name=name, Value=f"{{{{{name}}}}}", Type="String", Description=name)
+        tree = CompactTree.load("/ct")
+        assert len(tree) == 4
+        assert sorted(r.name for r in tree.records()) == ["/ct/a", "/ct/b/c", "/ct/b/c/e", "/ct/b/d"]
+        assert tree["/ct/b/c"].value == "{{/ct/b/c}}"
+        assert tree["b", "c", "e"].name == "/ct/b/c/e"
+        assert "/ct/b" not in tree and tree.node("/ct/b").is_dir()
+        assert sorted(n.name for n in tree.node("/ct/b").iterdir()) == ["/ct/b/c", "/ct/b/d"]
+        with pytest.raises(KeyError):
+            tree["/ct/nope"]  # pylint:disable=pointless-statement
+
+        param = tree.to_parameter("/ct/b/d")
+        assert isinstance(param, SSMParameter)
+        assert param.value == "{{/ct/b/d}}" and param.version == 1
+        assert param.description == "/ct/b/d"  # fetched lazily
+
+        path = tree.to_path()
+        assert path["b", "c", "e"].value == "{{/ct/b/c/e}}"
+        assert sorted(p.name for p in path.loaded_parameters()) == sorted(r.name for r in tree.records())
+
+        full = SSMPath(name="/ct")
+        full.fetch_parameters()
+        again = CompactTree.from_path(full)
+        assert again["/ct/a"].description == "/ct/a"
+        assert again.to_parameter("/ct/a")._got_metadata  # pylint:disable=protected-access
+
+    def test_add_outside_root(self):
+        from ssm_parameter_config.compact import CompactTree
+        from ssm_parameter_config.ssm_parameter import ParameterRecord
+
+        tree = CompactTree("/ct")
+        for name in ("/other/a", "/cta/b"):
+            with pytest.raises(ValueError):
+                tree.add(ParameterRecord(name, "v"))
+        assert len(tree) == 0
+        root = CompactTree("/")
+        root.add(ParameterRecord("/ct/a", "v"))
+        assert root["ct", "a"].value == "v"
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+
+import os
+import subprocess  # nosec B404
+import sys
+from pathlib import Path
+
+import ssm_parameter_config
+
+SRC = str(Path(ssm_parameter_config.__file__).parent.parent)
+
+LOCAL_ONLY = """
+import sys
+from ssm_parameter_config import SSMConfig
+
+class LocalConfig(SSMConfig):
+    name: str
+
+cfg = LocalConfig(_local_ssm_path=sys.argv[1])
+assert cfg.name == "local", cfg
+print(",".join(m for m in ("boto3", "botocore", "signed_pickle", "dotenv", "asyncio") if m in sys.modules))
+"""
+
+
+def run(code: str, *args: str) -> str:
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [SRC, os.environ.get("PYTHONPATH")]))}
+    return subprocess.run(  # nosec B603
+        [sys.executable, "-c", code, *args], capture_output=True, text=True, check=True, env=env
+    ).stdout.strip()
+
+
+class TestLazyImports:
+    def test_bare_import(self):
+        code = (
+            "import sys, ssm_parameter_config;"
+            "print(sorted(m for m in sys.modules if m.startswith(('boto', 'pydantic', 'ruamel'))))"
+        )
+        assert run(code) == "[]"
+
+    def test_local_config_skips_aws(self, tmp_path):
+        cfg = tmp_path / "config.yaml"
+        cfg.write_text("name: local\n")
+        assert run(LOCAL_ONLY, str(cfg)) == ""
+
+    def test_public_names(self):
+        from ssm_parameter_config import (  # pylint:disable=import-outside-toplevel
+            SSMConfig,
+            SSMParameter,
+            SSMPath,
+        )
+
+        assert ssm_parameter_config.SSMConfig is SSMConfig
+        assert {SSMParameter.__name__, SSMPath.__name__} <= set(dir(ssm_parameter_config))
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+#  pylint: disable=import-outside-toplevel
+from __future__ import annotations
+
+import pytest
+
+from ssm_parameter_config.instrument import (
+    LATENCY_BUCKETS,
+    Instrumentation,
+    InstrumentEvent,
+    disable_stats,
+    enable_stats,
+    instrumentation,
+)
+
+from .conftest import TConfig
+
+
+@pytest.fixture
+def stats():
+    collector = enable_stats()
+    collector.reset()
+    yield collector
+    disable_stats()
+    collector.reset()
+
+
+class TestInstrumentation:
+    def test_disabled_is_silent(self):
+        inst = Instrumentation()
+        events = []
+        assert inst.start() is None
+        inst.record("parse", "json", None, "/x")
+        inst.add_hook(events.append)
+        inst.record("parse", "json", inst.start(), "/x")
+        inst.remove_hook(events.append)
+        assert not inst.enabled
+        assert [(e.kind, e.operation, e.name) for e in events] == [("parse", "json", "/x")]
+
+    def test_broken_hook_is_contained(self):
+        inst = Instrumentation()
+
+        def broken(_event):
+            raise RuntimeError("boom")
+
+        events = []
+        inst.add_hook(broken)
+        inst.add_hook(events.append)
+        inst.emit(InstrumentEvent("api", "GetParameter", None, 0.01))
+        assert len(events) == 1
+
+    def test_histogram(self, stats):
+        for duration in (0.0005, 0.003, 0.003, 20.0):
+            stats(InstrumentEvent("api", "GetParameter", "/a", duration, throttles=1))
+        op = stats.operations()[("api", "GetParameter")]
+        assert op.calls == 4
+        assert op.throttles == 4
+        assert sum(op.histogram) == 4
+        assert op.histogram[LATENCY_BUCKETS.index(0.005)] == 2
+        assert op.percentile(0.5) == 0.005
+        assert op.percentile(1.0) == float("inf")
+
+    def test_api_calls_and_config_load(self, ssm_config_in_store, stats):
+        from ssm_parameter_config import SSMParameter, SSMPath
+
+        TConfig(_aws_ssm_path=ssm_config_in_store.name)
+        ops = stats.operations()
+        get = ops[("api", "GetParameter")]
+        assert get.calls == 1
+        assert get.bytes_sent > 0 and get.bytes_received > 0
+        assert ops[("source", "aws_ssm")].calls == 1
+        params = stats.parameters()
+        assert params[("parse", ssm_config_in_store.name)].calls == 1
+        assert params[("validate", ssm_config_in_store.name)].calls == 1
+
+        SSMPath(name="/basic").fetch_parameters()
+        assert stats.operations("tree_load")[("tree_load", "values+describe")].items == 1
+
+        SSMParameter(Name="/instrumented", Value="x").put_parameter()
+        put = stats.operations("put")[("put", "single")]
+        assert put.calls == 1 and put.bytes_sent == 1
+        assert "parameter_cache" in stats.summary()
+
+    def test_no_events_without_hooks(self, ssm):
+        from ssm_parameter_config import SSMParameter
+
+        assert not instrumentation.enabled
+        events = []
+        SSMParameter(Name="/quiet", Value="x").put_parameter()
+        instrumentation.add_hook(events.append)
+        try:
+            SSMParameter.get_parameter("/quiet", use_cache=False)
+        finally:
+            instrumentation.remove_hook(events.append)
+        assert [(e.kind, e.operation, e.name) for e in events] == [("api", "GetParameter", "/quiet")]
@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+
+import time
+from types import SimpleNamespace
+
+from ssm_parameter_config.ratelimit import RateLimiter, TokenBucket
+
+
+class TestRateLimiter:
+    def test_token_bucket_delays(self):
+        bucket = TokenBucket(rate=20, burst=1)
+        start = time.monotonic()
+        waits = [bucket.acquire() for _ in range(3)]
+        assert time.monotonic() - start >= 0.09
+        assert waits[0] == 0
+        stats = bucket.stats()
+        assert stats.calls == 3
+        assert stats.delayed == 2
+        assert stats.wait_time > 0
+
+    def test_throttle_adapts(self):
+        limiter = RateLimiter(rates={"get": (40, 40)})
+        throttled = ({}, {"Error": {"Code": "ThrottlingException"}})
+        op = SimpleNamespace(name="GetParametersByPath")
+        assert limiter._needs_retry(response=throttled, operation=op) is None
+        stats = limiter.stats()["get"]
+        assert stats.throttles == 1
+        assert stats.rate == 20
+        assert limiter.stats()["put"].throttles == 0
+
+        for _ in range(5):
+            limiter._after_call(model=op, parsed={})
+        assert limiter.stats()["get"].rate == 30
+
+    def test_attached_to_registry_clients(self, ssm):
+        from ssm_parameter_config import SSMParameter
+        from ssm_parameter_config.ratelimit import rate_limiter
+
+        before = rate_limiter.stats()["put"].calls
+        SSMParameter(Name="/limited", Value="x").put_parameter()
+        assert rate_limiter.stats()["put"].calls == before + 1
+
+    def test_recovers_after_success(self, ssm):
+        from ssm_parameter_config import SSMParameter
+        from ssm_parameter_config.ratelimit import rate_limiter
+
+        SSMParameter(Name="/limited", Value="x").put_parameter()
+        bucket = rate_limiter.bucket("GetParameter")
+        bucket.rate = bucket.max_rate / 2
+        try:
+            SSMParameter.get_parameter("/limited", use_cache=False)
+            assert bucket.rate > bucket.max_rate / 2
+        finally:
+            bucket.rate = bucket.max_rate
+
+    def test_throttle_through_client(self, ssm):
+        from botocore.awsrequest import AWSResponse
+        from botocore.config import Config
+
+        from ssm_parameter_config import SSMParameter
+        from ssm_parameter_config.clients import get_ssm_client
+        from ssm_parameter_config.ratelimit import rate_limiter
+
+        SSMParameter(Name="/limited", Value="x").put_parameter()
+        # a Config isn't hashable, so this client is built fresh and not kept in the registry
+        client = get_ssm_client(config=Config(retries={"mode": "standard", "max_attempts": 2}))
+        throttled = []
+
+        class Raw:
+            def stream(self, **_kwargs):
+                yield b'{"__type": "ThrottlingException", "message": "Rate exceeded"}'
+
+        def throttle_once(request, **_kwargs):
+            if throttled:
+                return None
+            throttled.append(request)
+            return AWSResponse(request.url, 400, {}, Raw())
+
+        # ahead of moto's own before-send handler, which would answer first
+        client.meta.events.register_first("before-send.ssm", throttle_once)
+        before = rate_limiter.stats()["get"].throttles
+        try:
+            assert client.get_parameter(Name="/limited")["Parameter"]["Value"] == "x"
+            assert len(throttled) == 1
+            stats = rate_limiter.stats()["get"]
+            assert stats.throttles == before + 1
+            # the retry succeeded, so the halved rate has started climbing back
+            assert stats.rate > rate_limiter.bucket("GetParameter").max_rate / 2
+        finally:
+            rate_limiter.configure("get")
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from ssm_parameter_config.singleflight import SingleFlight
+
+
+class TestSingleFlight:
+    def _run_shared(self, func):
+        flight = SingleFlight()
+        started = threading.Event()
+        release = threading.Event()
+
+        def work():
+            started.set()
+            release.wait(5)
+            return func()
+
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            leader = pool.submit(flight.do, "key", work)
+            started.wait(5)
+            follower = pool.submit(flight.do, "key", work)
+            while flight.shared == 0:
+                time.sleep(0.01)
+            release.set()
+            return leader, follower
+
+    def test_everyone_knows_the_result_is_shared(self):
+        leader, follower = self._run_shared(lambda: {"value": 1})
+        (led, led_shared), (followed, followed_shared) = leader.result(), follower.result()
+        # the leader is told as well, so it copies before changing anything the others can see
+        assert led_shared and followed_shared
+        assert led is followed
+
+    def test_errors_are_shared(self):
+        def fail():
+            raise KeyError("nope")
+
+        leader, follower = self._run_shared(fail)
+        with pytest.raises(KeyError):
+            leader.result()
+        with pytest.raises(KeyError):
+            follower.result()
+
+    def test_lone_call_is_not_shared(self):
+        flight = SingleFlight()
+        assert flight.do("key", lambda: 1) == (1, False)
+        assert flight.in_flight() == 0
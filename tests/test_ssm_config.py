@@ -1,12 +1,20 @@
 # -*- coding: utf-8 -*-
 from __future__ import annotations
 
+import asyncio
 import json
+from typing import Literal
 
+import pytest
+from botocore.exceptions import EndpointConnectionError
 from ruamel.yaml import YAML
 
-from ssm_parameter_config import SSMParameter
+from ssm_parameter_config import SSMConfig, SSMParameter
+from ssm_parameter_config.cache import parameter_cache
+from ssm_parameter_config.refresh import ConfigRefresher
+from ssm_parameter_config.snapshot import SnapshotStore, fetch_tree, set_snapshot_store
 from ssm_parameter_config.ssm_parameter import SSMDataType, SSMTier, SSMType
+from ssm_parameter_config.utils import lazy_dict
 from tests.conftest import EXPECTED_DICT, EXPECTED_ESCAPED_PARAM, TConfig
 
 yaml = YAML(typ="safe")
@@ -49,6 +57,125 @@ class TestSSMConfig:
         cfg_dict.pop("ssm_parameter")
         assert cfg_dict == exp_dict
 
+    def test_from_parameters(self, ssm_config_in_store):
+        configs = TConfig.from_parameters(ssm_config_in_store.name, "/missing/config")
+        assert list(configs) == [ssm_config_in_store.name]
+        cfg = configs[ssm_config_in_store.name]
+        assert isinstance(cfg, TConfig)
+        assert cfg.ssm_parameter.name == ssm_config_in_store.name
+        assert cfg.email_text == EXPECTED_DICT["email_text"]
+
+    def test_async_load(self, ssm_config_in_store, config_yaml):
+        cfg = asyncio.run(TConfig.aload(_local_ssm_path=config_yaml))
+        assert cfg.dict() == EXPECTED_DICT
+        configs = asyncio.run(TConfig.afrom_parameters(ssm_config_in_store.name))
+        assert configs[ssm_config_in_store.name].athena_database == "test_db"
+
+    def test_snapshot_fallback(self, ssm_config_in_store, tmp_path, monkeypatch):
+        store = SnapshotStore(tmp_path / "snapshot.json", max_stale=3600)
+        set_snapshot_store(store)
+        try:
+            TConfig(_aws_ssm_path=ssm_config_in_store.name)
+            assert store.get(ssm_config_in_store.name).version == 1
+            tree = fetch_tree("/basic")
+
+            def offline(*_args, **_kwargs):
+                raise EndpointConnectionError(endpoint_url="https://ssm.invalid")
+
+            monkeypatch.setattr(SSMParameter, "get_parameter", offline)
+            monkeypatch.setattr(SSMParameter, "_load_tree", offline)
+            parameter_cache.invalidate()
+            cfg = TConfig(_aws_ssm_path=ssm_config_in_store.name)
+            assert cfg.ssm_parameter.version == 1
+            assert cfg.email_text == EXPECTED_DICT["email_text"]
+            offline_tree = fetch_tree("/basic")
+            assert [(p.name, p.value) for p in offline_tree.loaded_parameters()] == [
+                (p.name, p.value) for p in tree.loaded_parameters()
+            ]
+            assert offline_tree["non", "existent"].is_dir()
+
+            store.max_stale = -1
+            with pytest.raises(EndpointConnectionError):
+                TConfig(_aws_ssm_path=ssm_config_in_store.name)
+
+            store.max_stale, store.serve_first = None, True
+            cfg = TConfig(_aws_ssm_path=ssm_config_in_store.name)
+            assert cfg.athena_database == "test_db"
+        finally:
+            set_snapshot_store(None)
+
+    def test_watch(self, ssm, ssm_config_in_store, monkeypatch):
+        refresher = ConfigRefresher()
+        cfg = TConfig(_aws_ssm_path=ssm_config_in_store.name)
+        changes = []
+        watched = cfg.watch(interval=3600, callback=lambda old, new: changes.append((old, new)), refresher=refresher)
+        try:
+            assert refresher.poll() == []
+            ssm.put_parameter(
+                Name=ssm_config_in_store.name,
+                Value=ssm_config_in_store.value.replace("test_db", "new_db"),
+                Overwrite=True,
+            )
+
+            # a failed rebuild is logged, and retried on the next poll
+            def broken(*_args, **_kwargs):
+                raise RuntimeError("broken")
+
+            with monkeypatch.context() as m:
+                m.setattr(TConfig, "__init__", broken)
+                assert refresher.poll() == []
+            assert watched.version == 1 and watched.config is cfg
+            assert refresher.poll() == [watched]
+            assert watched.config.athena_database == "new_db"
+            assert watched.version == 2
+            assert changes == [(cfg, watched.config)]
+            assert refresher.poll() == []
+        finally:
+            watched.stop()
+
+    def test_dispatch(self, scratch_registry):
+        class KindA(SSMConfig):
+            kind: Literal["a"] = "a"
+            shared: str
+
+            class Config:
+                ssm_config_discriminator = "kind"
+
+        class KindB(SSMConfig):
+            kind: Literal["b"] = "b"
+            shared: str
+
+            class Config:
+                ssm_config_discriminator = "kind"
+
+        cfg, info = SSMConfig.dispatch({"kind": "a", "shared": "x"})
+        assert isinstance(cfg, KindA)
+        assert info == (KindA, 1, 1)
+
+        obj = {k: v for k, v in EXPECTED_DICT.items() if k != "ssm_parameter"}
+        cfg, info = SSMConfig.dispatch(obj)
+        assert isinstance(cfg, TConfig)
+        assert info.config_class is TConfig
+        assert info.attempts == 1
+
+        with pytest.raises(ValueError):
+            SSMConfig.from_object({"kind": "c", "shared": "x"})
+
+    def test_from_file(self, config_yaml, monkeypatch):
+        from ssm_parameter_config import ssm_config as ssm_config_module
+
+        calls = []
+
+        def counting_lazy_dict(*args, **kwargs):
+            calls.append(args)
+            return lazy_dict(*args, **kwargs)
+
+        monkeypatch.setattr(ssm_config_module, "lazy_dict", counting_lazy_dict)
+        cfg = SSMConfig.from_file(config_yaml)
+        assert isinstance(cfg, TConfig)
+        assert cfg.dict() == EXPECTED_DICT
+        assert len(calls) == 1
+
     def test_to_parameter(self, ssm, ssm_config):
         cfg_param = ssm_config.to_parameter(ssm_parameter_path="/basic/non/existent/path")
         assert isinstance(cfg_param, SSMParameter)
@@ -76,3 +203,13 @@ class TestSSMConfig:
             "Value": EXPECTED_ESCAPED_PARAM,
             "Overwrite": True,
         }
+
+    def test_write_many(self, ssm, ssm_config):
+        ssm.put_parameter(Name="/many/b", Value="old", Type="String", Description="keep me")
+        other = TConfig(**{**ssm_config.dict(), "athena_database": "other_db"})
+        results = SSMConfig.write_many([(ssm_config, "/many/a"), (other, "/many/b")])
+        assert [(r.name, r.ok, r.version) for r in results] == [("/many/a", True, 1), ("/many/b", True, 2)]
+        assert other.ssm_parameter.version == 2
+        described = {p["Name"]: p for p in ssm.describe_parameters()["Parameters"]}
+        assert described["/many/b"]["Description"] == "keep me"
+        assert TConfig(_aws_ssm_path="/many/b").athena_database == "other_db"
@@ -2,8 +2,13 @@
 #  pylint: disable=import-outside-toplevel,no-member
 from __future__ import annotations
 
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import TYPE_CHECKING
 
+import pytest
+
 from tests.conftest import PARAMETER_NAME, PARAMETER_VALUE, PARAMETER_VALUE_ESCAPED
 
 if TYPE_CHECKING:
@@ -32,6 +37,388 @@ class TestSSMParameter:
         assert sp.value == PARAMETER_VALUE
         assert {t.key: t.value for t in sp.tags} == {"test-tag": "test-tag-value"}
 
+    def test_get_parameter_cached(self, ssm):
+        from ssm_parameter_config import SSMParameter
+        from ssm_parameter_config.cache import parameter_cache
+
+        ssm.put_parameter(Name=PARAMETER_NAME, Value=PARAMETER_VALUE_ESCAPED, Type="String")
+        first = SSMParameter.get_parameter(PARAMETER_NAME)
+        assert parameter_cache.stats().misses == 1
+        ssm.put_parameter(Name=PARAMETER_NAME, Value="changed", Type="String", Overwrite=True)
+        second = SSMParameter.get_parameter(PARAMETER_NAME)
+        assert parameter_cache.stats().hits == 1
+        assert second.value == first.value == PARAMETER_VALUE
+        assert second is not first
+        assert SSMParameter.get_parameter(PARAMETER_NAME, use_cache=False).value == "changed"
+
+        second.value = "written"
+        second.put_parameter()
+        assert PARAMETER_NAME not in parameter_cache
+        assert SSMParameter.get_parameter(PARAMETER_NAME).value == "written"
+
+    def test_parameter_cache_lru_ttl(self):
+        from ssm_parameter_config.cache import ParameterCache
+
+        cache = ParameterCache(ttl=None, maxsize=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        assert cache.get("a") == 1
+        cache.set("c", 3)
+        assert "b" not in cache
+        assert "a" in cache and "c" in cache
+        cache.invalidate("a")
+        assert cache.get("a", None) is None
+        cache.configure(ttl=-1, maxsize=2)
+        cache.set("d", 4)
+        assert cache.get("d", None) is None
+        assert cache.stats().hits == 1
+
+    def test_client_registry(self, ssm):
+        from ssm_parameter_config import SSMPath
+        from ssm_parameter_config.clients import (
+            clear_clients,
+            get_ssm_client,
+            set_ssm_client,
+        )
+
+        clear_clients()
+        client = get_ssm_client()
+        assert get_ssm_client() is client
+        assert get_ssm_client(region_name="us-west-1") is not client
+        assert SSMPath(name="/test").ssm_client is client
+
+        sp = SSMPath(name="/test")
+        sp.set_aws_client_kwargs(region_name="eu-west-1")
+        assert sp.ssm_client.meta.region_name == "eu-west-1"
+        assert sp["child"].ssm_client is sp.ssm_client
+
+        injected = object()
+        set_ssm_client(injected, endpoint_url="http://localhost:4566")  # type: ignore[arg-type]
+        assert get_ssm_client(endpoint_url="http://localhost:4566") is injected
+        clear_clients()
+
+    def test_get_parameters(self, ssm):
+        from ssm_parameter_config import SSMParameter
+
+        names = [f"/bulk/param{i:02d}" for i in range(23)]
+        for i, name in enumerate(names):
+            ssm.put_parameter(Name=name, Value=f"value {i}", Type="String", Description=f"descrip {i}")
+        params = SSMParameter.get_parameters(*names, "/bulk/missing", default_value="dflt")
+        assert list(params) == names + ["/bulk/missing"]
+        assert params["/bulk/param07"].value == "value 7"
+        assert params["/bulk/param22"].description == "descrip 22"
+        assert params["/bulk/missing"].value == "dflt"
+        assert SSMParameter.get_parameter("/bulk/param03").description == "descrip 3"
+
+    def test_get_parameter_lazy(self, ssm):
+        from ssm_parameter_config import SSMParameter
+
+        ssm.put_parameter(
+            Name=PARAMETER_NAME,
+            Value=PARAMETER_VALUE_ESCAPED,
+            Type="String",
+            Description="Test Descrip",
+            Tags=[{"Key": "test-tag", "Value": "test-tag-value"}],
+        )
+        calls = []
+        SSMParameter.get_parameter(PARAMETER_NAME).ssm_client.meta.events.register(
+            "before-call.ssm", lambda model, **_: calls.append(model.name), unique_id="test-lazy"
+        )
+        try:
+            sp = SSMParameter.get_parameter(PARAMETER_NAME, use_cache=False)
+            assert calls == ["GetParameter"]
+            assert sp.value == PARAMETER_VALUE
+            assert sp.description == "Test Descrip"
+            assert {t.key: t.value for t in sp.tags} == {"test-tag": "test-tag-value"}
+            assert calls == ["GetParameter", "DescribeParameters", "ListTagsForResource"]
+
+            # metadata fetched on one cache hit is kept for the next ones
+            calls.clear()
+            assert SSMParameter.get_parameter(PARAMETER_NAME).description == "Test Descrip"
+            assert SSMParameter.get_parameter(PARAMETER_NAME).description == "Test Descrip"
+            assert calls == []
+
+            calls.clear()
+            sp = SSMParameter.get_parameter(PARAMETER_NAME, use_cache=False, prefetch=True)
+            assert sp.description == "Test Descrip" and len(sp.tags) == 1
+            assert calls == ["GetParameter", "DescribeParameters", "ListTagsForResource"]
+
+            calls.clear()
+            sp = SSMParameter.get_parameter(PARAMETER_NAME, use_cache=False, values_only=True)
+            assert calls == ["GetParameter"]
+            assert sp.description == "Test Descrip"
+        finally:
+            sp.ssm_client.meta.events.unregister("before-call.ssm", unique_id="test-lazy")
+
+    def test_async_api(self, ssm):
+        from ssm_parameter_config import SSMParameter, SSMPath
+
+        async def run():
+            await SSMParameter(Name=PARAMETER_NAME, Value=PARAMETER_VALUE).aput_parameter()
+            unchanged = SSMParameter(Name=PARAMETER_NAME, Value=PARAMETER_VALUE)
+            await unchanged.aput_parameter(skip_unchanged=True, expected_version=1)
+            assert unchanged.version == 1
+            sp = await SSMParameter.aget_parameter(PARAMETER_NAME, use_cache=False, prefetch=True)
+            missing = await SSMParameter.aget_parameter("/not/here", default_value="dflt")
+            params = await SSMParameter.aget_parameters(*[f"{PARAMETER_NAME}{i}" for i in range(15)], PARAMETER_NAME)
+            children = [c async for c in SSMPath(name="/test/parameter").aiterdir()]
+            return sp, missing, params, children
+
+        sp, missing, params, children = asyncio.run(run())
+        assert sp.value == PARAMETER_VALUE
+        assert missing.value == "dflt"
+        assert len(params) == 16
+        assert params[PARAMETER_NAME].value == PARAMETER_VALUE
+        assert [c.name for c in children] == [PARAMETER_NAME]
+
+    def test_fetch_tree(self, ssm):
+        from ssm_parameter_config import SSMParameter, SSMPath
+
+        for i in range(12):
+            ssm.put_parameter(Name=f"/tree/a/p{i}", Value=f"a{i}", Type="String", Description=f"d{i}")
+        ssm.put_parameter(Name="/tree/b", Value="b", Type="String")
+        ssm.put_parameter(Name="/treetop", Value="not in tree", Type="String")
+
+        root = SSMPath(name="/tree")
+        root.fetch_parameters()
+        assert isinstance(root["b"], SSMParameter)
+        assert root["a", "p7"].value == "a7"
+        assert root["a", "p7"].description == "d7"
+        assert sorted(c.name for c in root.iterdir()) == ["/tree/a", "/tree/b"]
+        timing = root.load_timing
+        assert timing is not None and timing.parameters == 13
+        assert timing.total >= timing.build
+
+    def test_values_only(self, ssm):
+        from ssm_parameter_config import SSMParameter, SSMPath
+
+        ssm.put_parameter(Name="/vo/a/p", Value="v", Type="String", Description="descrip", Tier="Advanced")
+        root = SSMPath(name="/vo")
+        root.set_values_only()
+        root.fetch_parameters()
+        assert root.load_timing.describe == 0.0
+        param = root["a", "p"]
+        assert param.__dict__["description"] is None
+        assert param.description == "descrip"
+        assert param.tier == "Advanced"
+
+        sp = SSMParameter.get_parameter("/vo/a/p", use_cache=False)
+        assert sp.value == "v" and sp.__dict__["description"] is None
+        sp.put_parameter("new value")
+        described = ssm.describe_parameters()["Parameters"][0]
+        assert described["Description"] == "descrip"
+        assert described["Tier"] == "Advanced"
+
+    def test_metadata_retried_after_failure(self, ssm, monkeypatch):
+        from botocore.exceptions import EndpointConnectionError
+
+        from ssm_parameter_config import SSMParameter
+
+        ssm.put_parameter(Name="/meta/p", Value="v", Type="String", Description="descrip", Tier="Advanced")
+        sp = SSMParameter.get_parameter("/meta/p", use_cache=False)
+        client = sp.ssm_client
+        describe = client.describe_parameters
+
+        def failing(**_kwargs):
+            raise EndpointConnectionError(endpoint_url="https://ssm")
+
+        monkeypatch.setattr(client, "describe_parameters", failing)
+        with pytest.raises(EndpointConnectionError):
+            sp.tier  # pylint:disable=pointless-statement
+        monkeypatch.setattr(client, "describe_parameters", describe)
+        assert sp.tier == "Advanced"
+        assert sp.description == "descrip"
+
+    def test_concurrent_fetches_coalesce(self, ssm):
+        from ssm_parameter_config import SSMParameter, SSMPath
+        from ssm_parameter_config.clients import get_ssm_client
+
+        ssm.put_parameter(Name=PARAMETER_NAME, Value=PARAMETER_VALUE_ESCAPED, Type="String")
+        calls = []
+
+        def slow_call(model, **_):
+            calls.append(model.name)
+            time.sleep(0.2)
+
+        events = get_ssm_client().meta.events
+        events.register("before-call.ssm", slow_call, unique_id="test-coalesce")
+        try:
+            with ThreadPoolExecutor(max_workers=8) as pool:
+                params = list(pool.map(lambda _: SSMParameter.get_parameter(PARAMETER_NAME), range(8)))
+            assert calls == ["GetParameter"]
+            assert all(p.value == PARAMETER_VALUE for p in params)
+            assert len({id(p) for p in params}) == 8
+
+            calls.clear()
+            root = SSMPath(name="/test")
+            with ThreadPoolExecutor(max_workers=8) as pool:
+                listings = list(pool.map(lambda _: [c.name for c in root.iterdir()], range(8)))
+            assert listings == [["/test/parameter"]] * 8
+            assert sorted(calls) == ["DescribeParameters", "GetParametersByPath"]
+        finally:
+            events.unregister("before-call.ssm", unique_id="test-coalesce")
+
+    def test_put_parameters(self, ssm):
+        from ssm_parameter_config import SSMParameter
+
+        params = [SSMParameter(Name=f"/bulk/p{i}", Value=f"v{i}") for i in range(5)]
+        params.append(SSMParameter(Name="/aws/reserved", Value="nope"))
+        params.append(SSMParameter(Name="/bulk/no-value"))  # fails before any call is made
+        results = SSMParameter.put_parameters(params, max_workers=4)
+        assert [r.name for r in results] == [p.name for p in params]
+        assert all(r.ok and r.version == 1 for r in results[:5])
+        assert not results[5].ok and results[5].error is not None
+        assert not results[6].ok and results[6].error is not None
+        assert ssm.get_parameter(Name="/bulk/p3")["Parameter"]["Value"] == "v3"
+        assert SSMParameter.put_parameters([]) == []
+
+    def test_diff_aware_writes(self, ssm):
+        from ssm_parameter_config import SSMParameter
+        from ssm_parameter_config.ssm_parameter import VersionConflictError, WriteAction
+
+        ssm.put_parameter(Name="/diff/same", Value=PARAMETER_VALUE_ESCAPED, Type="String", Description="d")
+        ssm.put_parameter(Name="/diff/changed", Value="old", Type="String")
+        params = [
+            SSMParameter(Name="/diff/same", Value=PARAMETER_VALUE),
+            SSMParameter(Name="/diff/changed", Value="new"),
+            SSMParameter(Name="/diff/new", Value="new"),
+        ]
+        plans = SSMParameter.plan_writes(params)
+        assert [(p.action, p.current_version) for p in plans] == [
+            (WriteAction.noop, 1),
+            (WriteAction.update, 1),
+            (WriteAction.create, None),
+        ]
+        [plan] = SSMParameter.plan_writes([SSMParameter(Name="/diff/same", Value=PARAMETER_VALUE, Description="x")])
+        assert plan.action == WriteAction.update
+
+        results = SSMParameter.put_parameters(params, skip_unchanged=True)
+        assert [(r.action, r.version) for r in results] == [
+            (WriteAction.noop, 1),
+            (WriteAction.update, 2),
+            (WriteAction.create, 1),
+        ]
+        described = {p["Name"]: p for p in ssm.describe_parameters()["Parameters"]}
+        assert described["/diff/same"]["Version"] == 1
+
+        stale = SSMParameter(Name="/diff/changed", Value="newer")
+        stale.version = 1
+        [result] = SSMParameter.put_parameters([stale], check_versions=True)
+        assert not result.ok and isinstance(result.error, VersionConflictError)
+        with pytest.raises(VersionConflictError):
+            SSMParameter(Name="/diff/changed", Value="newer").put_parameter(expected_version=0)
+        SSMParameter(Name="/diff/changed", Value="newer").put_parameter(expected_version=2)
+        assert ssm.get_parameter(Name="/diff/changed")["Parameter"]["Version"] == 3
+
+    def test_skip_unchanged_keeps_tier(self, ssm):
+        from ssm_parameter_config import SSMParameter
+        from ssm_parameter_config.ssm_parameter import WriteAction
+
+        ssm.put_parameter(Name="/diff/advanced", Value="v", Type="String", Tier="Advanced", Description="d")
+        # fetched without metadata, so the tier field still holds the Standard default
+        sp = SSMParameter.get_parameter("/diff/advanced", use_cache=False)
+        assert sp.__dict__["tier"] == "Standard"
+        [result] = SSMParameter.put_parameters([sp], skip_unchanged=True)
+        assert result.action == WriteAction.noop
+        assert ssm.get_parameter(Name="/diff/advanced")["Parameter"]["Version"] == 1
+        assert sp.tier == "Advanced"
+
+    def test_skip_unchanged_secure_string(self, ssm):
+        from ssm_parameter_config import SSMParameter
+        from ssm_parameter_config.ssm_parameter import WriteAction
+
+        ssm.put_parameter(Name="/diff/secret", Value="hunter2", Type="SecureString")
+        secret = SSMParameter(Name="/diff/secret", Value="hunter2", Type="SecureString")
+        no_value = SSMParameter(Name="/diff/no-value")
+        results = SSMParameter.put_parameters([secret, no_value], skip_unchanged=True)
+        assert [(r.ok, r.action) for r in results] == [(True, WriteAction.noop), (False, None)]
+        assert ssm.get_parameter(Name="/diff/secret")["Parameter"]["Version"] == 1
+        # the plaintext doesn't end up in the parameter cache
+        assert SSMParameter.get_parameter("/diff/secret").value != "hunter2"
+
+    def test_refresh_tree(self, ssm):
+        from ssm_parameter_config import SSMPath
+
+        for name in ("/rt/a", "/rt/b", "/rt/c/d", "/rt/c/e", "/rt/f/g"):
+            ssm.put_parameter(Name=name, Value=name, Type="String")
+        root = SSMPath(name="/rt")
+        assert not root.refresh().updated
+        before = {p.name: p for p in root.loaded_parameters()}
+        assert sorted(before) == ["/rt/a", "/rt/b", "/rt/c/d", "/rt/c/e", "/rt/f/g"]
+
+        ssm.put_parameter(Name="/rt/b", Value="new b", Type="String", Overwrite=True)
+        ssm.put_parameter(Name="/rt/c/h", Value="h", Type="String")
+        ssm.delete_parameter(Name="/rt/c/d")
+        ssm.delete_parameter(Name="/rt/f/g")
+        changes = root.refresh()
+        assert [p.name for p in changes.added] == ["/rt/c/h"]
+        assert [(p.name, p.value, p.version) for p in changes.updated] == [("/rt/b", "new b", 2)]
+        assert sorted(p.name for p in changes.deleted) == ["/rt/c/d", "/rt/f/g"]
+
+        after = {p.name: p for p in root.loaded_parameters()}
+        assert sorted(after) == ["/rt/a", "/rt/b", "/rt/c/e", "/rt/c/h"]
+        assert after["/rt/a"] is before["/rt/a"] and after["/rt/c/e"] is before["/rt/c/e"]
+        assert sorted(c.name for c in root.iterdir()) == ["/rt/a", "/rt/b", "/rt/c"]
+        assert not root.refresh()
+
+        # an updated parameter with children keeps them, and isn't listed from SSM again
+        ssm.put_parameter(Name="/rt/c/e/x", Value="x", Type="String")
+        root.refresh()
+        ssm.put_parameter(Name="/rt/c/e", Value="new e", Type="String", Overwrite=True)
+        [updated] = root.refresh().updated
+        assert updated._listed
+        calls = []
+        client = updated.ssm_client
+        client.meta.events.register("before-call.ssm", lambda model, **_: calls.append(model.name), unique_id="t-rt")
+        try:
+            assert [c.name for c in updated.iterdir()] == ["/rt/c/e/x"]
+        finally:
+            client.meta.events.unregister("before-call.ssm", unique_id="t-rt")
+        assert not calls
+
+    def test_iter_parameters(self, ssm):
+        from ssm_parameter_config import SSMPath
+
+        for i in range(25):
+            ssm.put_parameter(Name=f"/it/{i % 3}/p{i}", Value=f"{{{{v{i}}}}}", Type="String", Description=f"d{i}")
+        ssm.put_parameter(Name="/it/top", Value="top", Type="SecureString")
+        root = SSMPath(name="/it")
+
+        records = list(root.iter_parameters())
+        assert len(records) == 26
+        assert not root._children  # pylint:disable=protected-access
+        rec = next(r for r in records if r.name == "/it/1/p4")
+        assert rec.value == "{{v4}}" and rec.version == 1 and rec.description is None
+
+        assert [r.name for r in root.iter_parameters(recursive=False)] == ["/it/top"]
+        described = {r.name: r for r in root.iter_parameters(fields=["description", "tier"])}
+        assert described["/it/2/p5"].description == "d5" and described["/it/2/p5"].value is None
+        assert described["/it/2/p5"].type is None and described["/it/2/p5"].version is None
+        versions = {r.name: r for r in root.iter_parameters(fields=["name", "version"])}
+        assert versions["/it/2/p5"][:4] == ("/it/2/p5", None, None, 1)
+        joined = {r.name: r for r in root.iter_parameters(fields=["value", "description"])}
+        assert len(joined) == 26 and joined["/it/0/p9"][:2] == ("/it/0/p9", "{{v9}}")
+        assert joined["/it/0/p9"].description == "d9"
+        secure = root.iter_parameters(filters=[{"Key": "Type", "Option": "Equals", "Values": ["SecureString"]}])
+        assert [r.name for r in secure] == ["/it/top"]
+        with pytest.raises(ValueError):
+            list(root.iter_parameters(fields=["nope"]))
+
+    def test_insert_parameters(self):
+        from ssm_parameter_config import SSMParameter, SSMPath
+
+        root = SSMPath(name="/ins")
+        root._listed = True  # pylint:disable=protected-access
+        names = ["/ins/a/b/c", "/ins/a/b", "/ins/a/d", "/ins/e", "/ins/a/b/f/g"]
+        root._insert_parameters(SSMParameter(Name=n, Value=n) for n in names)  # pylint:disable=protected-access
+        assert sorted(p.name for p in root.loaded_parameters()) == sorted(names)
+        b = root["a", "b"]
+        assert isinstance(b, SSMParameter) and b.value == "/ins/a/b"
+        assert sorted(c.name for c in b.iterdir()) == ["/ins/a/b/c", "/ins/a/b/f"]
+        assert root["a", "b", "f"].name == "/ins/a/b/f"
+        with pytest.raises(ValueError):
+            root._insert_parameter(SSMParameter(Name="/other/x", Value=""))  # pylint:disable=protected-access
+
     #
     #
     # def test_path(self):
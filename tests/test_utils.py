@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+
+from io import StringIO
+
+import dotenv
+import pytest
+
+from ssm_parameter_config.utils import format_header, lazy_dict, sniff_format
+
+ENV_VALUE = "export ATHENA_DATABASE=test_db\nEMAIL_FROM='no-reply@test.com'\nURL=http://x/?a=b\n"
+YAML_VALUE = "# comment\nathena_database: test_db\nurl: http://x/?a=b\n"
+JSON_VALUE = '{"athena_database": "test_db"}'
+
+
+class TestLazyDict:
+    @pytest.mark.parametrize(
+        "value,fmt",
+        [
+            (ENV_VALUE, "env"),
+            (YAML_VALUE, "yaml"),
+            (JSON_VALUE, "json"),
+            ("- a\n- b", "yaml"),
+            ("[1, 2]", "json"),
+            ("", "yaml"),
+        ],
+    )
+    def test_sniff_format(self, value, fmt):
+        assert sniff_format(value) == fmt
+
+    @pytest.mark.parametrize("round_trip", [True, False])
+    def test_lazy_dict(self, round_trip):
+        assert lazy_dict(ENV_VALUE, round_trip=round_trip)["ATHENA_DATABASE"] == "test_db"
+        assert lazy_dict(ENV_VALUE, round_trip=round_trip)["URL"] == "http://x/?a=b"
+        assert lazy_dict(YAML_VALUE, round_trip=round_trip) == {"athena_database": "test_db", "url": "http://x/?a=b"}
+        assert lazy_dict(JSON_VALUE, round_trip=round_trip) == {"athena_database": "test_db"}
+        # flow style yaml looks like json, but still parses
+        assert lazy_dict("{a: 1}", round_trip=round_trip) == {"a": 1}
+
+    @pytest.mark.parametrize(
+        "value",
+        [
+            "A=1\nB='two words'\n  export C = x y  \n# comment\n\nD=\nE=''\n",
+            'A="quoted"\nB=x\n',
+            "A=$B\n",
+            "A='it\\'s'\n",
+            "A=x #comment\n",
+            "A=a#b\n",
+        ],
+    )
+    def test_env_matches_dotenv(self, value):
+        assert lazy_dict(value, fmt="env") == dict(dotenv.dotenv_values(stream=StringIO(value)))
+
+    def test_format_hint(self):
+        assert lazy_dict(format_header("json") + JSON_VALUE) == {"athena_database": "test_db"}
+        assert lazy_dict("A=1\n") == {"A": "1"}
+        assert lazy_dict(format_header("yaml") + "A=1\n") == "A=1"
+        assert lazy_dict("A=1\n", fmt="yaml") == "A=1"
+        with pytest.raises(ValueError):
+            lazy_dict(JSON_VALUE, fmt="toml")